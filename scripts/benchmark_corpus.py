@@ -0,0 +1,64 @@
+"""Report the accuracy and speed of release names classification on the regression corpus."""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import guessit
+import tmdbsimple as tmdb
+
+from mvodb.corpus import evaluate_parse, evaluate_pipeline, load_corpus
+from mvodb.provider import TMDBProvider
+from mvodb.recorded import RecordedSession, RecordedStore
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+RECORDED_STRIDE = 10  # responses are recorded for one name out of ten, see gen_corpus.py
+
+
+def main() -> int:
+    """
+    Run the harness and print its reports.
+
+    Returns:
+        An exit code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=str(FIXTURES / "corpus.jsonl"), help="Corpus file.")
+    parser.add_argument("--responses", default=str(FIXTURES / "tmdb.json"), help="Recorded TMDB responses.")
+    parser.add_argument("--pipeline", action="store_true", help="Also resolve names against recorded responses.")
+    parser.add_argument("--stride", type=int, default=1, help="Only parse one name out of STRIDE.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print misclassified names.")
+    parser.add_argument(
+        "--update-failures",
+        action="store_true",
+        dest="update_failures",
+        help="Write the misclassified names, the guessit version and the parsing speed "
+        "to the expected failures file of the tests (implies --pipeline).",
+    )
+    args = parser.parse_args()
+    if args.update_failures:
+        args.pipeline, args.stride = True, 1
+
+    entries = load_corpus(args.corpus)
+    reports = [("parse", evaluate_parse(entries[:: args.stride]))]
+    if args.pipeline:
+        tmdb.API_KEY = tmdb.API_KEY or "recorded"
+        provider = TMDBProvider(session=RecordedSession(RecordedStore.load(args.responses)))
+        reports.append(("pipeline", evaluate_pipeline(entries[::RECORDED_STRIDE], provider)))
+    for stage, report in reports:
+        print(f"{stage}: {report.summary()}")
+        if args.verbose:
+            for name, failure in report.failures.items():
+                print(f"  {name}: {failure}")
+    if args.update_failures:
+        failures = {"guessit": guessit.__version__, "names_per_second": round(reports[0][1].names_per_second)}
+        failures.update((stage, dict(sorted(report.failures.items()))) for stage, report in reports)
+        with open(FIXTURES / "corpus_failures.json", "w") as stream:
+            json.dump(failures, stream, indent=2)
+            stream.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
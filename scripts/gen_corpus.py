@@ -0,0 +1,415 @@
+"""Generate the release names corpus and the TMDB responses used by the regression tests."""
+
+import json
+import random
+import re
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+MOVIES = [
+    ("Inception", 2010),
+    ("The Dark Knight", 2008),
+    ("Pulp Fiction", 1994),
+    ("The Matrix", 1999),
+    ("Fight Club", 1999),
+    ("Forrest Gump", 1994),
+    ("Interstellar", 2014),
+    ("Gladiator", 2000),
+    ("The Prestige", 2006),
+    ("Memento", 2000),
+    ("Amelie", 2001),
+    ("Spirited Away", 2001),
+    ("Parasite", 2019),
+    ("Whiplash", 2014),
+    ("The Departed", 2006),
+    ("Goodfellas", 1990),
+    ("Se7en", 1995),
+    ("The Usual Suspects", 1995),
+    ("Heat", 1995),
+    ("Casino", 1995),
+    ("Alien", 1979),
+    ("Aliens", 1986),
+    ("Blade Runner", 1982),
+    ("Arrival", 2016),
+    ("Drive", 2011),
+    ("Zodiac", 2007),
+    ("Prisoners", 2013),
+    ("Sicario", 2015),
+    ("Oldboy", 2003),
+    ("Amadeus", 1984),
+    ("Jaws", 1975),
+    ("Rocky", 1976),
+    ("Taxi Driver", 1976),
+    ("The Shining", 1980),
+    ("Scarface", 1983),
+    ("Braveheart", 1995),
+    ("Titanic", 1997),
+    ("Fargo", 1996),
+    ("Inglourious Basterds", 2009),
+    ("No Country for Old Men", 2007),
+    ("There Will Be Blood", 2007),
+    ("The Social Network", 2010),
+    ("Mad Max Fury Road", 2015),
+    ("Gravity", 2013),
+    ("Her", 2013),
+    ("Moonlight", 2016),
+    ("Joker", 2019),
+    ("Dune", 2021),
+    ("Tenet", 2020),
+    ("Up", 2009),
+    ("Ratatouille", 2007),
+    ("Coco", 2017),
+    ("Amour", 2012),
+    ("Leon", 1994),
+    ("La Haine", 1995),
+    ("Intouchables", 2011),
+    ("The Grand Budapest Hotel", 2014),
+    ("Eternal Sunshine of the Spotless Mind", 2004),
+    ("Children of Men", 2006),
+    ("Pan's Labyrinth", 2006),
+]
+
+SHOWS = [
+    ("The Wire", 5, 13),
+    ("Breaking Bad", 5, 13),
+    ("Friends", 10, 24),
+    ("The Sopranos", 6, 13),
+    ("Mad Men", 7, 13),
+    ("Seinfeld", 9, 22),
+    ("Dexter", 8, 12),
+    ("Lost", 6, 24),
+    ("House", 8, 22),
+    ("Fringe", 5, 22),
+    ("Chernobyl", 1, 5),
+    ("Succession", 4, 10),
+    ("Fargo", 5, 10),
+    ("Sherlock", 4, 3),
+    ("Westworld", 4, 10),
+    ("Dark", 3, 10),
+    ("Narcos", 3, 10),
+    ("Mindhunter", 2, 9),
+    ("Better Call Saul", 6, 13),
+    ("Game of Thrones", 8, 10),
+    ("The Office", 9, 24),
+    ("Parks and Recreation", 7, 22),
+    ("Twin Peaks", 3, 18),
+    ("Deadwood", 3, 12),
+    ("Battlestar Galactica", 4, 20),
+    ("The Expanse", 6, 13),
+    ("Severance", 2, 10),
+    ("Ozark", 4, 14),
+    ("Stranger Things", 4, 9),
+    ("The Crown", 6, 10),
+    ("Black Mirror", 6, 6),
+    ("Six Feet Under", 5, 13),
+    ("Boardwalk Empire", 5, 12),
+    ("The Leftovers", 3, 10),
+    ("Band of Brothers", 1, 10),
+    ("True Detective", 4, 8),
+    ("Atlanta", 4, 10),
+    ("Barry", 4, 8),
+    ("Veep", 7, 10),
+    ("Justified", 6, 13),
+]
+
+RESOLUTIONS = ["480p", "720p", "1080p", "2160p"]
+SOURCES = ["BluRay", "WEB-DL", "WEBRip", "HDTV", "DVDRip", "BDRip"]
+CODECS = ["x264", "x265", "H.264", "HEVC", "XviD"]
+GROUPS = ["SPARKS", "DIMENSION", "LOL", "NTb", "FGT", "RARBG", "YIFY", "KILLERS", "AMIABLE", "GECKOS"]
+VIDEO_EXTENSIONS = ["mkv", "mp4", "avi"]
+SUBTITLE_LANGUAGES = ["en", "fr"]
+
+MOVIE_PATTERNS = [
+    "{dotted}.{year}.{resolution}.{source}.{codec}-{group}.{ext}",
+    "{spaced} ({year}) [{resolution}].{ext}",
+    "{underscored}_{year}_{resolution}.{ext}",
+    "{dotted}.{year}.{source}.{codec}.{ext}",
+    "{lower}.{year}.{resolution}.{ext}",
+    "{dotted}.{year}.{resolution}.{source}-{group}.{language}.srt",
+]
+
+EPISODE_PATTERNS = [
+    "{dotted}.S{season:02}E{episode:02}.{resolution}.{source}.{codec}-{group}.{ext}",
+    "{spaced} - {season}x{episode:02}.{ext}",
+    "{lower}.s{season:02}e{episode:02}.{resolution}.{ext}",
+    "{spaced} S{season:02}E{episode:02} [{resolution}].{ext}",
+    "{dotted}.S{season:02}E{episode:02}.{source}.{codec}-{group}.{ext}",
+    "{dotted}.S{season:02}E{episode:02}.{resolution}.{source}-{group}.{language}.srt",
+]
+
+YEAR_TITLED_MOVIES = [
+    ("Blade Runner 2049", 2017),
+    ("2001 A Space Odyssey", 1968),
+    ("1917", 2019),
+    ("2012", 2009),
+    ("Wonder Woman 1984", 2020),
+    ("Apollo 13", 1995),
+    ("21 Jump Street", 2012),
+    ("300", 2006),
+    ("10 Cloverfield Lane", 2016),
+    ("1984", 1984),
+]
+
+YEAR_TAGGED_SHOWS = [
+    ("Doctor Who", 2005, 13, 13),
+    ("Shameless", 2011, 11, 12),
+    ("House of Cards", 2013, 6, 13),
+    ("Battlestar Galactica", 2004, 4, 20),
+]
+
+YEAR_TITLED_SHOWS = [
+    ("1923", 2, 8),
+    ("11 22 63", 1, 8),
+    ("24", 9, 24),
+]
+
+FOREIGN_MOVIES = [
+    ("Das Boot", 1981),
+    ("Amores Perros", 2000),
+    ("Das Leben der Anderen", 2006),
+    ("Y Tu Mama Tambien", 2001),
+    ("Cidade de Deus", 2002),
+    ("Lola Rennt", 1998),
+    ("El Laberinto del Fauno", 2006),
+    ("Les Choristes", 2004),
+    ("La Vita e Bella", 1997),
+    ("Der Untergang", 2004),
+]
+
+FOREIGN_SHOWS = [
+    ("La Casa de Papel", 5, 10),
+    ("Les Revenants", 2, 8),
+    ("Gomorra", 5, 12),
+    ("Lupin", 3, 5),
+    ("Babylon Berlin", 4, 12),
+    ("Borgen", 4, 10),
+    ("Kaamelott", 6, 100),
+]
+
+ANIME = [
+    ("One Piece", 1100),
+    ("Naruto Shippuden", 500),
+    ("Bleach", 366),
+    ("Detective Conan", 1100),
+    ("Fairy Tail", 328),
+    ("Shingeki no Kyojin", 25),
+    ("Black Clover", 170),
+    ("Boruto", 293),
+]
+
+DAILY_SHOWS = [
+    "The Daily Show",
+    "Last Week Tonight with John Oliver",
+    "The Tonight Show Starring Jimmy Fallon",
+    "Late Night with Seth Meyers",
+    "Real Time with Bill Maher",
+]
+
+LANGUAGE_TAGS = ["FRENCH", "TRUEFRENCH", "GERMAN", "SPANISH", "ITALIAN", "MULTi", "VOSTFR"]
+ANIME_GROUPS = ["SubsPlease", "HorribleSubs", "Erai-raws", "Judas"]
+
+YEAR_TAGGED_EPISODE_PATTERNS = [
+    "{dotted}.{year}.S{season:02}E{episode:02}.{resolution}.{source}.{codec}-{group}.{ext}",
+    "{spaced} ({year}) - {season}x{episode:02}.{ext}",
+    "{dotted}.{year}.S{season:02}E{episode:02}.{resolution}.{ext}",
+]
+
+MULTI_EPISODE_PATTERNS = [
+    "{dotted}.S{season:02}E{episode:02}E{next_episode:02}.{resolution}.{source}.{codec}-{group}.{ext}",
+    "{spaced} - {season}x{episode:02}-{next_episode:02}.{ext}",
+    "{dotted}.S{season:02}E{episode:02}-E{next_episode:02}.{resolution}.{ext}",
+]
+
+FOREIGN_MOVIE_PATTERNS = [
+    "{dotted}.{year}.{tag}.{resolution}.{source}.{codec}-{group}.{ext}",
+    "{dotted}.{year}.{tag}.{source}.{codec}.{ext}",
+    "{spaced} ({year}) [{tag}] [{resolution}].{ext}",
+]
+
+FOREIGN_EPISODE_PATTERNS = [
+    "{dotted}.S{season:02}E{episode:02}.{tag}.{resolution}.{source}.{codec}-{group}.{ext}",
+    "{dotted}.S{season:02}E{episode:02}.{tag}.{source}.{codec}.{ext}",
+    "{spaced} - {season}x{episode:02} [{tag}].{ext}",
+]
+
+ANIME_PATTERNS = [
+    "[{anime_group}] {spaced} - {episode:02} [{resolution}].{ext}",
+    "[{anime_group}] {spaced} - {episode:03} ({resolution}) [{crc}].mkv",
+    "{dotted}.{episode:03}.{resolution}.{ext}",
+]
+
+DATE_PATTERNS = [
+    "{dotted}.{date:%Y.%m.%d}.{resolution}.{source}.{codec}-{group}.{ext}",
+    "{spaced} {date:%Y-%m-%d} [{resolution}].{ext}",
+    "{lower}.{date:%Y.%m.%d}.{resolution}.{ext}",
+]
+
+NAMES_PER_MOVIE = 15
+NAMES_PER_SHOW = 55
+NAMES_PER_VARIANT = 30
+PIPELINE_STRIDE = 10
+SEED = 20210308
+
+
+def _forms(title: str) -> dict:
+    words = re.sub(r"[^\w\s]", "", title).split()
+    return {
+        "dotted": ".".join(words),
+        "spaced": " ".join(words),
+        "underscored": "_".join(words),
+        "lower": ".".join(words).lower(),
+    }
+
+
+def _fields(rng: random.Random) -> dict:
+    return {
+        "resolution": rng.choice(RESOLUTIONS),
+        "source": rng.choice(SOURCES),
+        "codec": rng.choice(CODECS),
+        "group": rng.choice(GROUPS),
+        "ext": rng.choice(VIDEO_EXTENSIONS),
+        "language": rng.choice(SUBTITLE_LANGUAGES),
+        "tag": rng.choice(LANGUAGE_TAGS),
+        "anime_group": rng.choice(ANIME_GROUPS),
+        "crc": f"{rng.getrandbits(32):08X}",
+    }
+
+
+def _names(rng: random.Random, patterns: List[str], count: int, expected: Callable[[], dict]) -> List[dict]:
+    entries = []
+    for index in range(count):
+        values = expected()
+        fields = {key: value for key, value in values.items() if key not in {"type", "title", "episode"}}
+        episode = values.get("episode")
+        if isinstance(episode, list):
+            fields.update(episode=episode[0], next_episode=episode[1])
+        elif episode is not None:
+            fields.update(episode=episode)
+        fields.update(_forms(values["title"]), **_fields(rng))
+        name = patterns[index % len(patterns)].format(**fields)
+        if "date" in values:
+            values["date"] = values["date"].isoformat()
+        entries.append({"name": name, **values})
+    return entries
+
+
+def _episode(rng: random.Random, title: str, seasons: int, episodes: int, multi: bool = False) -> dict:
+    season = rng.randint(1, seasons)
+    if multi:
+        episode = rng.randint(1, episodes - 1)
+        return {"type": "episode", "title": title, "season": season, "episode": [episode, episode + 1]}
+    return {"type": "episode", "title": title, "season": season, "episode": rng.randint(1, episodes)}
+
+
+def gen_corpus(rng: random.Random) -> list:
+    """
+    Generate release names with the values they were built from.
+
+    Arguments:
+        rng: The random generator.
+
+    Returns:
+        Corpus entries, without duplicate names.
+    """
+    entries = []
+    for title, year in (*MOVIES, *YEAR_TITLED_MOVIES):
+        movie = {"type": "movie", "title": title, "year": year}
+        entries.extend(_names(rng, MOVIE_PATTERNS, NAMES_PER_MOVIE, movie.copy))
+    for title, year in FOREIGN_MOVIES:
+        movie = {"type": "movie", "title": title, "year": year}
+        entries.extend(_names(rng, FOREIGN_MOVIE_PATTERNS, NAMES_PER_MOVIE, movie.copy))
+    for title, seasons, episodes in SHOWS:
+        entries.extend(_names(rng, EPISODE_PATTERNS, NAMES_PER_SHOW, lambda: _episode(rng, title, seasons, episodes)))
+        multi = lambda: _episode(rng, title, seasons, episodes, multi=True)  # noqa: E731
+        entries.extend(_names(rng, MULTI_EPISODE_PATTERNS, NAMES_PER_VARIANT // 6, multi))
+    for title, seasons, episodes in YEAR_TITLED_SHOWS:
+        entries.extend(
+            _names(rng, EPISODE_PATTERNS, NAMES_PER_VARIANT, lambda: _episode(rng, title, seasons, episodes))
+        )
+    for title, seasons, episodes in FOREIGN_SHOWS:
+        foreign = lambda: _episode(rng, title, seasons, episodes)  # noqa: E731
+        entries.extend(_names(rng, FOREIGN_EPISODE_PATTERNS, NAMES_PER_VARIANT, foreign))
+    for title, year, seasons, episodes in YEAR_TAGGED_SHOWS:
+        tagged = lambda: dict(_episode(rng, title, seasons, episodes), year=year)  # noqa: E731
+        entries.extend(_names(rng, YEAR_TAGGED_EPISODE_PATTERNS, NAMES_PER_VARIANT, tagged))
+    for title, count in ANIME:
+        absolute = lambda: {"type": "episode", "title": title, "episode": rng.randint(1, count)}  # noqa: E731
+        entries.extend(_names(rng, ANIME_PATTERNS, NAMES_PER_VARIANT, absolute))
+    for title in DAILY_SHOWS:
+        daily = lambda: {"type": "episode", "title": title, "date": _random_date(rng)}  # noqa: E731
+        entries.extend(_names(rng, DATE_PATTERNS, NAMES_PER_VARIANT, daily))
+    unique = list({entry["name"]: entry for entry in entries}.values())
+    rng.shuffle(unique)
+    return unique
+
+
+def _random_date(rng: random.Random) -> date:
+    return date(2015, 1, 1) + timedelta(days=rng.randint(0, 3000))
+
+
+def gen_responses(entries: list) -> dict:
+    """
+    Generate TMDB responses for the entries exercised by the pipeline tests.
+
+    Only movies and episodes with a season and a single episode number get responses,
+    since mvodb cannot look up the other ones.
+
+    Arguments:
+        entries: The corpus entries.
+
+    Returns:
+        Responses indexed by request (see `mvodb.recorded.request_key`).
+        Single episodes are served from the recorded seasons.
+    """
+    responses = {}
+    movies = [title for title, _ in (*MOVIES, *YEAR_TITLED_MOVIES, *FOREIGN_MOVIES)]
+    shows = {
+        title: episodes for title, *_, episodes in (*SHOWS, *YEAR_TAGGED_SHOWS, *YEAR_TITLED_SHOWS, *FOREIGN_SHOWS)
+    }
+    show_ids = {title: 1000 + number for number, title in enumerate(shows)}
+    for entry in entries[::PIPELINE_STRIDE]:
+        title = entry["title"]
+        if entry["type"] == "movie":
+            result = {"id": 100 + movies.index(title), "title": title, "release_date": f"{entry['year']}-01-01"}
+            responses[f"/search/movie?query={title.casefold()}"] = {"page": 1, "results": [result], "total_results": 1}
+            continue
+        if "season" not in entry or not isinstance(entry["episode"], int):
+            continue
+        show_id = show_ids[title]
+        result = {"id": show_id, "name": title}
+        responses[f"/search/tv?query={title.casefold()}"] = {"page": 1, "results": [result], "total_results": 1}
+        season = {
+            "id": show_id * 100 + entry["season"],
+            "season_number": entry["season"],
+            "episodes": [
+                {"episode_number": number, "season_number": entry["season"], "name": f"Episode {number}"}
+                for number in range(1, shows[title] + 1)
+            ],
+        }
+        responses[f"/tv/{show_id}/season/{entry['season']}"] = season
+    return dict(sorted(responses.items()))
+
+
+def main() -> int:
+    """
+    Write the corpus and the responses in the tests fixtures directory.
+
+    Returns:
+        An exit code.
+    """
+    fixtures = Path(__file__).parent.parent / "tests" / "fixtures"
+    entries = gen_corpus(random.Random(SEED))
+    with open(fixtures / "corpus.jsonl", "w") as stream:
+        for entry in entries:
+            stream.write(json.dumps(entry) + "\n")
+    responses = gen_responses(entries)
+    with open(fixtures / "tmdb.json", "w") as stream:
+        lines = [f"  {json.dumps(key)}: {json.dumps(response)}" for key, response in responses.items()]
+        stream.write("{\n" + ",\n".join(lines) + "\n}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,4 +6,6 @@ Rename and move files using metadata from online databases.
 
 from typing import List
 
-__all__: List[str] = []  # noqa: WPS410 (the only __variable__ we use)
+from mvodb.api import apply, parse_many, plan, resolve_many, scan
+
+__all__: List[str] = ["apply", "parse_many", "plan", "resolve_many", "scan"]  # noqa: WPS410
@@ -0,0 +1,237 @@
+"""
+Module that contains the batch-oriented library API.
+
+The pipeline is made of five steps accepting iterables. All but the last one return lazy streams:
+
+```python
+from mvodb import apply, parse_many, plan, resolve_many, scan
+from mvodb.provider import TMDBProvider
+from mvodb.templates import PathTemplates
+
+provider = TMDBProvider()  # keep it around to reuse its caches
+templates = PathTemplates("/media/library")
+
+guesses = resolve_many(parse_many(scan(["/downloads"])), provider)
+for move, error in apply(plan(guesses, templates)):
+    print(move.source, "->", move.destination, error or "")
+```
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from mvodb.catalog import Catalog
+from mvodb.estimate import PlannedMove
+from mvodb.fingerprint import HashIndex, opensubtitles_hash
+from mvodb.guess import Guess
+from mvodb.metrics import CACHE_HITS, CACHE_MISSES, FILES_SCANNED, STAGE_SECONDS
+from mvodb.prefetch import plan_prefetch, prefetch
+from mvodb.provider import DEFAULT_PROVIDER, TMDBProvider
+from mvodb.scheduler import MoveScheduler
+from mvodb.templates import PathTemplates
+
+EXTENSIONS = ("srt", "mkv", "mp4", "avi")
+"""Extensions of the files handled by mvodb."""
+
+LIBRARY_ROOT = Path("/media/mybookplex/multimedia")
+"""Default library directory."""
+
+DEFAULT_TEMPLATES = PathTemplates(LIBRARY_ROOT)
+"""Default path templates, rendering paths in the default library directory."""
+
+BATCH_SIZE = 256
+"""Default number of files resolved together by the command line.
+
+Each file loads at most three seasons (one per candidate show), so that a batch
+fits in the caches of a default provider: seasons are not evicted before being used.
+"""
+
+
+def filter_ext(files, whitelist):
+    return [f for f in files if os.path.splitext(f)[1][1:].lower() in whitelist]
+
+
+def scan(paths: Iterable[Union[str, Path]], extensions: Iterable[str] = EXTENSIONS) -> Iterator[Path]:
+    """
+    Find the files to process.
+
+    Arguments:
+        paths: Files, or directories searched recursively.
+        extensions: The accepted extensions, without dots.
+
+    Yields:
+        File paths, once each even if found through several arguments.
+    """
+    extensions = tuple(extensions)
+    seen = set()
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            candidates = list(path.glob("**/*"))
+        else:
+            candidates = [path]
+        for file in filter_ext(candidates, extensions):
+            key = os.path.abspath(file)
+            if key in seen:
+                continue
+            seen.add(key)
+            FILES_SCANNED.inc()
+            yield file
+
+
+def parse_many(names: Iterable[Union[str, Path]]) -> Iterator[Guess]:
+    """
+    Parse file names, without any network access.
+
+    Arguments:
+        names: File paths.
+
+    Yields:
+        Guesses.
+    """
+    for name in names:
+        with STAGE_SECONDS.time(stage="guess"):
+            guess = Guess(str(name))
+        yield guess
+
+
+def _batches(items: Iterable, size: Optional[int]) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+        if size is None:
+            return
+
+
+def _fetch(guess: Guess, provider: TMDBProvider) -> None:
+    try:
+        with STAGE_SECONDS.time(stage="fetch"):
+            guess.fetch(provider)
+    except Exception as error:
+        guess.error = error
+
+
+def _resolve_batch(
+    guesses: List[Guess],
+    provider: TMDBProvider,
+    index: Optional[HashIndex],
+    workers: int,
+) -> None:
+    unknown = []
+    for guess in guesses:
+        if index is not None:
+            try:
+                with STAGE_SECONDS.time(stage="hash"):
+                    guess.data["hash"] = opensubtitles_hash(guess.data["filename"])
+            except OSError as error:
+                guess.error = error
+                continue
+            metadata = index.get(guess.data["hash"])
+            if metadata is not None:
+                CACHE_HITS.inc(cache="hash_index")
+                guess.resolve(metadata)
+                continue
+            CACHE_MISSES.inc(cache="hash_index")
+        unknown.append(guess)
+    prefetch(plan_prefetch(unknown), provider)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda guess: _fetch(guess, provider), unknown))
+
+
+def resolve_many(
+    guesses: Iterable[Guess],
+    provider: Optional[TMDBProvider] = None,
+    index: Optional[HashIndex] = None,
+    workers: int = 4,
+    batch_size: Optional[int] = None,
+) -> Iterator[Guess]:
+    """
+    Fetch the matches of guesses.
+
+    Files found in the hash index are resolved locally. For the others,
+    seasons are prefetched once per show, then lookups run concurrently.
+    A failed lookup does not stop the others: its error is stored in the `error` attribute of the guess.
+
+    Arguments:
+        guesses: The guesses to resolve.
+        provider: The metadata provider (default: the default provider).
+        index: The hash index to look files up in. Without index, files are not hashed.
+        workers: Number of concurrent lookups.
+        batch_size: Number of guesses resolved together. Without batch size, all guesses are resolved together.
+            Keep it below a third of the provider cache size, or prefetched seasons get evicted before being used.
+
+    Yields:
+        The resolved guesses, in order.
+    """
+    provider = provider or DEFAULT_PROVIDER
+    for batch in _batches(guesses, batch_size):
+        _resolve_batch(batch, provider, index, workers)
+        yield from batch
+
+
+def plan(guesses: Iterable[Guess], templates: PathTemplates = DEFAULT_TEMPLATES) -> Iterator[PlannedMove]:
+    """
+    Compute the destination of resolved guesses.
+
+    Arguments:
+        guesses: Resolved guesses.
+        templates: The path templates.
+
+    Yields:
+        Planned moves, using the best match of each guess.
+        Guesses that failed to resolve are skipped, as well as guesses without match,
+        which get a `LookupError` in their `error` attribute.
+    """
+    for guess in guesses:
+        if guess.error is not None:
+            continue
+        try:
+            match = guess.get_match()
+        except LookupError as error:
+            guess.error = error
+            continue
+        yield PlannedMove(guess.data["filename"], templates.render(match), match, guess.data.get("hash"))
+
+
+def apply(
+    moves: Iterable[PlannedMove],
+    scheduler: Optional[MoveScheduler] = None,
+    catalog: Optional[Catalog] = None,
+    index: Optional[HashIndex] = None,
+) -> List[Tuple[PlannedMove, Optional[BaseException]]]:
+    """
+    Apply planned moves, creating directories once per batch.
+
+    Unlike the other steps, moves are applied right away, before returning.
+    Moves that would overwrite a file, or the destination of another move, fail with a `FileExistsError`.
+    Successful moves are recorded in the catalog with their metadata,
+    and in the hash index when the file hash is known.
+
+    Arguments:
+        moves: The planned moves.
+        scheduler: The scheduler applying the moves (default: one copy at a time per pair of devices).
+        catalog: The catalog recording moved items.
+        index: The hash index recording the metadata of moved files.
+
+    Returns:
+        Each move, with the error that made it fail, or None.
+    """
+    moves = list(moves)
+    for directory in {Path(move.destination).parent for move in moves}:
+        directory.mkdir(parents=True, exist_ok=True)
+    errors = {id(move): error for move, error in (scheduler or MoveScheduler()).run(moves)}
+    moved = [move for move in moves if id(move) not in errors]
+    if catalog is not None:
+        catalog.record((move.source, move.destination, move.metadata) for move in moved if move.metadata)
+    if index is not None:
+        for move in moved:
+            if move.file_hash and move.metadata:
+                metadata = {key: value for key, value in move.metadata.items() if key not in {"ext", "lang"}}
+                index.add(move.file_hash, metadata)
+    return [(move, errors.get(id(move))) for move in moves]
@@ -0,0 +1,223 @@
+"""Module that contains thread-safe caches and request coalescing."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+from mvodb.metrics import CACHE_HITS, CACHE_MISSES, COALESCED_LOOKUPS
+
+T = TypeVar("T")  # noqa: WPS111 (short name)
+MISSING = object()
+"""Sentinel returned by [`LRUCache.get`][mvodb.cache.LRUCache.get] for absent keys."""
+
+
+class CacheStats:
+    """Statistics of a cache."""
+
+    __slots__ = ("hits", "misses", "evictions")
+
+    def __init__(self):
+        """Initialize the statistics."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return f"CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """The ratio of hits over all lookups, or None if there was no lookup."""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+
+class LRUCache:
+    """A bounded, thread-safe cache evicting the least recently used entries."""
+
+    def __init__(self, maxsize: Optional[int] = 1024, name: str = ""):
+        """
+        Initialize the cache.
+
+        Arguments:
+            maxsize: The maximum number of entries, or None for an unbounded cache.
+            name: The name used to label the cache metrics. Without name, metrics are not updated.
+        """
+        self.maxsize = maxsize
+        self.name = name
+        self.stats = CacheStats()
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return a value and mark it as recently used.
+
+        Arguments:
+            key: The key.
+
+        Returns:
+            The value, or [`MISSING`][mvodb.cache.MISSING].
+        """
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.stats.misses += 1
+                value = MISSING
+            else:
+                self.stats.hits += 1
+                value = self._data[key]
+        if self.name:
+            (CACHE_MISSES if value is MISSING else CACHE_HITS).inc(cache=self.name)
+        return value
+
+    def peek(self, key: Hashable) -> Any:
+        """
+        Return a value without updating statistics or recency.
+
+        Arguments:
+            key: The key.
+
+        Returns:
+            The value, or [`MISSING`][mvodb.cache.MISSING].
+        """
+        with self._lock:
+            return self._data.get(key, MISSING)
+
+    def set(self, key: Hashable, value: Any) -> None:  # noqa: A003 (not a builtin in this context)
+        """
+        Store a value, evicting the least recently used one if the cache is full.
+
+        Arguments:
+            key: The key.
+            value: The value.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._data.clear()
+            self.stats = CacheStats()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into a single one, sharing its result or error."""
+
+    def __init__(self):
+        """Initialize the group of calls."""
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        """
+        Call a function, unless a call with the same key is in flight, in which case wait for its result.
+
+        Arguments:
+            key: The key identifying the call.
+            function: The function to call.
+
+        Raises:
+            BaseException: The error raised by the shared call, if any.
+
+        Returns:
+            The result of the shared call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]  # noqa: WPS420 (del statement)
+            call.done.set()
+        return call.result
+
+
+class Memo:
+    """An LRU cache coupled with a singleflight group, to compute each value once."""
+
+    def __init__(self, maxsize: Optional[int] = 1024, name: str = ""):
+        """
+        Initialize the memo.
+
+        Arguments:
+            maxsize: The maximum number of cached values, or None for an unbounded cache.
+            name: The name used to label the cache metrics.
+        """
+        self.name = name
+        self.cache = LRUCache(maxsize, name)
+        self.flight = SingleFlight()
+
+    def get(self, key: Hashable, function: Callable[[], T]) -> T:
+        """
+        Return the cached value of a key, computing it if needed.
+
+        Concurrent calls for the same missing key wait for a single computation.
+        Errors are shared with the waiting calls, but are not cached.
+
+        Arguments:
+            key: The key.
+            function: The function computing the value.
+
+        Returns:
+            The value.
+        """
+        value = self.cache.get(key)
+        if value is not MISSING:
+            return value
+        leader = []
+
+        def load():  # noqa: WPS430 (nested function)
+            leader.append(True)
+            # another call may have completed between our lookup and becoming the leader
+            result = self.cache.peek(key)
+            if result is not MISSING:
+                return result
+            result = function()
+            self.cache.set(key, result)
+            return result
+
+        value = self.flight.do(key, load)
+        if not leader and self.name:
+            COALESCED_LOOKUPS.inc(cache=self.name)
+        return value
+
+    def clear(self) -> None:
+        """Remove all cached values and reset statistics."""
+        self.cache.clear()
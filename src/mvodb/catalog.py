@@ -0,0 +1,96 @@
+"""Module that contains the catalog of organized items."""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from mvodb.paths import data_path
+
+
+def default_catalog_path() -> Path:
+    """
+    Return the default location of the catalog.
+
+    Returns:
+        A path in the user data directory.
+    """
+    return data_path("catalog.db")
+
+
+class Catalog:
+    """A local catalog storing the resolved metadata and current path of each organized item."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize the catalog.
+
+        Arguments:
+            path: The SQLite database file, created if it does not exist.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute("CREATE TABLE IF NOT EXISTS items (path TEXT PRIMARY KEY, metadata TEXT NOT NULL)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def add(self, path: Union[str, Path], metadata: dict) -> None:
+        """
+        Record an organized item.
+
+        Arguments:
+            path: The current path of the item.
+            metadata: The metadata used to compute its path.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO items (path, metadata) VALUES (?, ?)",
+                (str(path), json.dumps(metadata)),
+            )
+
+    @property
+    def root(self) -> Optional[str]:
+        """
+        Return the library directory in which items were organized.
+
+        Returns:
+            The directory, or None if no item was organized yet.
+        """
+        row = self.connection.execute("SELECT value FROM settings WHERE key = 'root'").fetchone()
+        return row[0] if row else None
+
+    @root.setter
+    def root(self, root: Union[str, Path]) -> None:
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('root', ?)", (str(root),))
+
+    def items(self) -> Iterator[Tuple[str, dict]]:
+        """
+        Iterate over the organized items.
+
+        Yields:
+            Tuples of path and metadata.
+        """
+        for path, metadata in self.connection.execute("SELECT path, metadata FROM items ORDER BY path"):
+            yield path, json.loads(metadata)
+
+    def record(self, moves: Iterable[Tuple[str, str, dict]]) -> None:
+        """
+        Record several moved items at once, replacing their previous path if they were already cataloged.
+
+        Arguments:
+            moves: Tuples of old path, new path and metadata.
+        """
+        moves = list(moves)
+        with self.connection:
+            self.connection.executemany("DELETE FROM items WHERE path = ?", [(old,) for old, _, _ in moves])
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO items (path, metadata) VALUES (?, ?)",
+                [(new, json.dumps(metadata)) for _, new, metadata in moves],
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.connection.close()
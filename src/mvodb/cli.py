@@ -13,126 +13,131 @@
 
 import argparse
 import os
-from functools import lru_cache
+import sys
 from pathlib import Path
 from typing import List, Optional
 
 import tmdbsimple as tmdb
-from guessit import guessit
-from langdetect import detect
-from langdetect.lang_detect_exception import LangDetectException
-
-tmdb.API_KEY = os.environ.get("TMDB_API_KEY")
-LANG = {"English": "eng", "French": "fre"}
-
-
-class Guess:
-    def __init__(self, name):
-        self.data = guessit(name)
-        self.data["filename"] = name
-        self.data["ext"] = name.split(".")[-1]
-        self.fetch()
-
-    def __hash__(self):
-        if self.is_movie:
-            return hash(("movie", self.data["title"], self.data["year"]))
-        elif self.is_episode:
-            return hash(("movie", self.data["title"], self.data["season"], self.data["episode"]))
-        return hash("unknown")
-
-    def __eq__(self, other):
-        return hash(self) == hash(other)
-
-    @property
-    def is_episode(self):
-        return self.data["type"] == "episode"
-
-    @property
-    def is_movie(self):
-        return self.data["type"] == "movie"
-
-    def fetch(self):
-        if self.data["ext"] == "srt":
-            try:
-                self.data["lang"] = self.data["subtitle_language"].alpha3
-            except (KeyError, AttributeError):
-                with open(self.data["filename"]) as stream:
-                    text = stream.read()
-                if text:
-                    try:
-                        self.data["lang"] = detect(text)
-                    except LangDetectException:
-                        pass
-        if self.is_episode:
-            self.data["matches"] = get_episode_matches(self.data["title"], self.data["season"], self.data["episode"])
-        elif self.is_movie:
-            self.data["matches"] = get_movie_matches(self.data["title"])
-        raise ValueError
-
-    def get_new_path(self, match_index=0):
-        if self.is_episode:
-            return episode_to_path(self.data)
-        elif self.is_movie:
-            return movie_to_path(self.data)
-        raise ValueError
-
-
-@lru_cache()
-def get_episode_matches(title, season_number, episode_number):
-    search = tmdb.Search()
-    search.tv(query=title)
-    results = []
-    for tv_show in search.results[:3]:
-        episode = tmdb.TV_Episodes(tv_show["id"], season_number, episode_number)
-        episode.info()
-        results.append(
-            {
-                "tvshow": tv_show["name"],
-                "season": season_number,
-                "episode": episode_number,
-                "title": episode.name,
-            }
-        )
-    return results
-
-
-@lru_cache()
-def get_movie_matches(title):
-    search = tmdb.Search()
-    search.movie(query=title)
-    results = []
-    for movie in search.results[:3]:
-        results.append(
-            {
-                "title": movie["title"],
-                "year": movie["release_date"].split("-")[0],
-            }
-        )
-    return results
 
+from mvodb.api import BATCH_SIZE, LIBRARY_ROOT, apply, filter_ext, parse_many, plan, resolve_many, scan
+from mvodb.catalog import Catalog, default_catalog_path
+from mvodb.dedup import find_duplicates
+from mvodb.estimate import DEFAULT_THROUGHPUT, Estimate, PlannedMove, existing_ancestor, measure_throughput
+from mvodb.fingerprint import HashIndex, default_index_path
+from mvodb.guess import Guess
+from mvodb.metrics import Reporter, serve
+from mvodb.provider import DEFAULT_BASE_URL, DEFAULT_PROVIDER, TMDBProvider
+from mvodb.recorded import FixtureServer, RateLimiter, RecordedStore
+from mvodb.scheduler import MoveScheduler
+from mvodb.templates import EPISODE_TEMPLATE, MOVIE_TEMPLATE, SUBTITLE_TEMPLATE, PathTemplates
+
+__all__ = [
+    "Guess",
+    "filter_ext",
+    "get_parser",
+    "get_retemplate_parser",
+    "get_tmdb_server_parser",
+    "main",
+    "retemplate",
+    "tmdb_server",
+]
+
+
+def _prune_empty_dirs(directory: Path, root: Path) -> None:
+    while directory != root and root in directory.parents:
+        try:
+            directory.rmdir()
+        except OSError:
+            return
+        directory = directory.parent
+
+
+def _apply(
+    moves: List[PlannedMove],
+    scheduler: MoveScheduler,
+    catalog: Catalog,
+    index: Optional[HashIndex] = None,
+) -> List[PlannedMove]:
+    moved = []
+    for move, error in apply(moves, scheduler, catalog, index):
+        if error is None:
+            moved.append(move)
+        else:
+            print(f"Could not move '{move.source}' to '{move.destination}': {error}", file=sys.stderr)
+    return moved
 
-def episode_to_path(data):
-    n = data["tvshow"]
-    s = f"{data['season']:02}"
-    e = f"{data['episode']:02}"
-    t = data["title"]
-    x = data["ext"]
-    if "lang" in data and data["lang"]:
-        x = f"{data['lang']}.{x}"
-    return f"series/{n}/Season {s}/{n} - S{s}E{e} - {t}.{x}"
 
+def _add_scheduler_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="Number of concurrent copies between two devices (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--pair-jobs",
+        metavar=("SOURCE", "DEST", "N"),
+        nargs=3,
+        action="append",
+        default=[],
+        dest="pair_jobs",
+        help="Number of concurrent copies from the device of SOURCE to the device of DEST. Can be repeated.",
+    )
+    parser.add_argument(
+        "--bwlimit",
+        metavar="MB/S",
+        type=float,
+        default=None,
+        help="Maximum total throughput of copies, in megabytes per second.",
+    )
 
-def movie_to_path(data):
-    t = data["title"]
-    y = data["year"]
-    x = data["ext"]
-    if "lang" in data and data["lang"]:
-        x = f"{data['lang']}.{x}"
-    return f"movies/{t} ({y})/{t} ({y}).{x}"
 
+def _get_scheduler(parser: argparse.ArgumentParser, args: argparse.Namespace) -> MoveScheduler:
+    limits = {}
+    for source, destination, jobs in args.pair_jobs:
+        if not jobs.isdigit():
+            parser.error(f"argument --pair-jobs: invalid number of jobs: '{jobs}'")
+        pair = (os.stat(existing_ancestor(source)).st_dev, os.stat(existing_ancestor(destination)).st_dev)
+        limits[pair] = int(jobs)
+    bandwidth = args.bwlimit * 1e6 if args.bwlimit else None
+    return MoveScheduler(limits, args.jobs, bandwidth)
 
-def filter_ext(files, whitelist):
-    return [f for f in files if os.path.splitext(f)[1][1:].lower() in whitelist]
+
+def _add_template_arguments(parser: argparse.ArgumentParser, root: Optional[str] = str(LIBRARY_ROOT)) -> None:
+    parser.add_argument(
+        "--root",
+        metavar="DIR",
+        default=root,
+        help="Library directory in which files are moved "
+        + ("(default: %(default)s)." if root else "(default: the one recorded in the catalog)."),
+    )
+    parser.add_argument(
+        "--movie-template",
+        metavar="TEMPLATE",
+        default=MOVIE_TEMPLATE,
+        help="Path template for movies (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--episode-template",
+        metavar="TEMPLATE",
+        default=EPISODE_TEMPLATE,
+        help="Path template for episodes (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--subtitle-template",
+        metavar="TEMPLATE",
+        default=SUBTITLE_TEMPLATE,
+        help="Template for the extension of subtitles with a known language (default: %(default)s).",
+    )
+
+
+def _get_templates(parser: argparse.ArgumentParser, args: argparse.Namespace) -> PathTemplates:
+    try:
+        return PathTemplates(args.root, args.movie_template, args.episode_template, args.subtitle_template)
+    except ValueError as error:
+        parser.error(str(error))
 
 
 def get_parser() -> argparse.ArgumentParser:
@@ -142,19 +147,156 @@ def get_parser() -> argparse.ArgumentParser:
     Returns:
         An argparse parser.
     """
-    parser = argparse.ArgumentParser(prog="mvodb")
+    parser = argparse.ArgumentParser(
+        prog="mvodb",
+        epilog="To move organized items after changing the naming scheme, run 'mvodb retemplate'. "
+        "To serve recorded TMDB responses locally, run 'mvodb tmdb-server'.",
+    )
     parser.add_argument("files", nargs="+", metavar="FILE", help="Files to move/rename.")
     parser.add_argument(
         "-y", "--no-confirm", action="store_true", default=False, dest="no_confirm", help="Do not ask confirmation."
     )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        default=False,
+        dest="dry_run",
+        help="Only print the planned moves, do not move anything.",
+    )
+    parser.add_argument(
+        "--estimate",
+        action="store_true",
+        default=False,
+        help="Estimate the number of renames and copies, the bytes to copy and the duration of the moves.",
+    )
+    parser.add_argument(
+        "--throughput",
+        metavar="MB/S",
+        type=float,
+        default=DEFAULT_THROUGHPUT / 1e6,
+        help="Copy throughput used for estimates, in megabytes per second (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--measure-throughput",
+        action="store_true",
+        default=False,
+        dest="measure_throughput",
+        help="Measure the throughput of each destination device for estimates, by writing a temporary file.",
+    )
+    parser.add_argument(
+        "--catalog",
+        metavar="FILE",
+        default=str(default_catalog_path()),
+        help="Catalog recording organized items (default: %(default)s).",
+    )
+    _add_template_arguments(parser)
+    _add_scheduler_arguments(parser)
+    parser.add_argument(
+        "--duplicates",
+        choices=["check", "skip", "ignore"],
+        default="check",
+        help="Check for files present several times in the sources and flag them, "
+        "skip them, or ignore duplicates entirely (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--check-library",
+        action="store_true",
+        default=False,
+        dest="check_library",
+        help="Also check for files already present in the library, as recorded in the catalog.",
+    )
+    parser.add_argument(
+        "--read-budget",
+        metavar="BYTES",
+        type=int,
+        default=None,
+        help="Maximum number of bytes read to compare whole files when checking duplicates.",
+    )
+    parser.add_argument(
+        "--lookup-workers",
+        metavar="N",
+        type=int,
+        default=4,
+        help="Number of concurrent online lookups. Identical lookups are only sent once (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        metavar="N",
+        type=int,
+        default=BATCH_SIZE,
+        dest="batch_size",
+        help="Number of files resolved together, their seasons being loaded at once (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--tmdb-url",
+        metavar="URL",
+        default=DEFAULT_BASE_URL,
+        dest="tmdb_url",
+        help="Base URL of the TMDB API, for example the one of 'mvodb tmdb-server'. "
+        "Can also be set with the TMDB_BASE_URL environment variable.",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="FILE",
+        default=str(default_index_path()),
+        help="Hash index used to identify already seen files without searching online (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--no-index", action="store_false", default=True, dest="use_index", help="Do not use the hash index."
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        default=None,
+        help="Write metrics to this file in the Prometheus text format, at the end and at each interval.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        metavar="PORT",
+        type=int,
+        default=None,
+        help="Serve metrics in the Prometheus text format on this local port.",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        metavar="SECONDS",
+        type=float,
+        default=None,
+        help="Log metrics as JSON lines on standard error every SECONDS, and at the end.",
+    )
     return parser
 
 
-def main(args: Optional[List[str]] = None) -> int:
+def get_retemplate_parser() -> argparse.ArgumentParser:
     """
-    Run the main program.
+    Return the argument parser of the `retemplate` command.
 
-    This function is executed when you type `mvodb` or `python -m mvodb`.
+    Returns:
+        An argparse parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="mvodb retemplate",
+        description="Move organized items to the paths given by the current naming scheme, "
+        "using the metadata recorded in the catalog.",
+    )
+    parser.add_argument(
+        "-y", "--no-confirm", action="store_true", default=False, dest="no_confirm", help="Do not ask confirmation."
+    )
+    parser.add_argument(
+        "--catalog",
+        metavar="FILE",
+        default=str(default_catalog_path()),
+        help="Catalog recording organized items (default: %(default)s).",
+    )
+    _add_template_arguments(parser, root=None)
+    _add_scheduler_arguments(parser)
+    return parser
+
+
+def retemplate(args: Optional[List[str]] = None) -> int:
+    """
+    Run the `retemplate` command.
 
     Arguments:
         args: Arguments passed from the command line.
@@ -162,36 +304,259 @@ def main(args: Optional[List[str]] = None) -> int:
     Returns:
         An exit code.
     """
-    parser = get_parser()
+    parser = get_retemplate_parser()
     args = parser.parse_args(args=args)
-
-    buffer = []
-    for path in args.files:
-        path = Path(path)
-        if path.is_dir():
-            dir_files = list(path.glob("**/*"))
+    catalog = Catalog(args.catalog)
+    if args.root is None:
+        args.root = catalog.root or str(LIBRARY_ROOT)
+    templates = _get_templates(parser, args)
+
+    outside = [path for path, _ in catalog.items() if templates.root.absolute() not in Path(path).absolute().parents]
+    if outside:
+        catalog.close()
+        parser.error(
+            f"{len(outside)} cataloged items, like '{outside[0]}', are outside the library directory "
+            f"'{templates.root}': pass the directory they are in with --root"
+        )
+    moves = []
+    targets = set()
+    for path, metadata in catalog.items():
+        new_path = templates.render(metadata)
+        if new_path == path:
+            continue
+        if not os.path.exists(path):
+            print(f"'{path}' does not exist anymore, skipping", file=sys.stderr)
+        elif new_path in targets or os.path.exists(new_path):
+            print(f"'{new_path}' already exists, not moving '{path}'", file=sys.stderr)
         else:
-            dir_files = [path]
+            targets.add(new_path)
+            moves.append(PlannedMove(path, new_path, metadata))
+
+    if moves and not args.no_confirm:
+        for move in moves:
+            print(f"mv '{move.source}' '{move.destination}'")
+        answer = input(f"Apply these {len(moves)} moves? [Yn] ")  # nosec
+        if answer not in ("", "y", "Y"):
+            moves = []
+
+    moved = _apply(moves, _get_scheduler(parser, args), catalog)
+    catalog.close()
+    for move in moved:
+        _prune_empty_dirs(Path(move.source).parent, templates.root)
+    return 0 if len(moved) == len(moves) else 1
+
+
+def get_tmdb_server_parser() -> argparse.ArgumentParser:
+    """
+    Return the argument parser of the `tmdb-server` command.
+
+    Returns:
+        An argparse parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="mvodb tmdb-server",
+        description="Serve recorded TMDB responses locally, to run mvodb without network access "
+        "or API key, with simulated latency, errors and rate limiting.",
+    )
+    parser.add_argument("responses", metavar="FILE", help="Recorded responses (see the 'mvodb.recorded' module).")
+    parser.add_argument("--port", type=int, default=8000, help="The port to listen on (default: %(default)s).")
+    parser.add_argument("--address", default="127.0.0.1", help="The address to bind (default: %(default)s).")
+    parser.add_argument(
+        "--latency", metavar="SECONDS", type=float, default=0, help="Delay before each response (default: none)."
+    )
+    parser.add_argument(
+        "--jitter", metavar="SECONDS", type=float, default=0, help="Maximum random delay added to the latency."
+    )
+    parser.add_argument(
+        "--error-rate",
+        metavar="RATIO",
+        type=float,
+        default=0,
+        dest="error_rate",
+        help="Ratio of requests answered with a 503 error, between 0 and 1 (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        metavar="N",
+        type=float,
+        default=None,
+        dest="rate_limit",
+        help="Maximum number of requests per second, others are answered with a 429 error.",
+    )
+    parser.add_argument(
+        "--burst", metavar="N", type=float, default=None, help="Maximum number of requests at once (default: N)."
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the random jitter and errors.")
+    return parser
 
-        for file in filter_ext(dir_files, ["srt", "mkv", "mp4", "avi"]):
-            guess = Guess(str(file))
-            new_path = "/media/mybookplex/multimedia/" + guess.get_new_path()
-            buffer.append({"original": file, "new": new_path, "answer": True})
 
-    if not args.no_confirm:
-        for item in buffer:
-            original, new = item["original"], item["new"]
-            answer = input(f"mv '{original}' '{new}' [Yn] ")  # nosec
-            if answer not in ("", "y", "Y"):
-                item["answer"] = False
+def tmdb_server(args: Optional[List[str]] = None) -> int:
+    """
+    Run the `tmdb-server` command.
 
-    for item in [i for i in buffer if i["answer"]]:
-        Path(item["new"]).parent.mkdir(parents=True, exist_ok=True)
-        os.rename(item["original"], item["new"])
+    Arguments:
+        args: Arguments passed from the command line.
 
+    Returns:
+        An exit code.
+    """
+    parser = get_tmdb_server_parser()
+    args = parser.parse_args(args=args)
+    if not 0 <= args.error_rate <= 1:
+        parser.error("argument --error-rate: must be between 0 and 1")
+    rate_limit = RateLimiter(args.rate_limit, args.burst) if args.rate_limit else None
+    server = FixtureServer(
+        RecordedStore.load(args.responses),
+        args.port,
+        args.address,
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        rate_limit,
+        args.seed,
+    )
+    print(f"Serving {len(server.store.responses)} responses, run mvodb with --tmdb-url {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(
+            f"{server.requests} requests, {server.errors} errors, {server.rate_limited} rate limited", file=sys.stderr
+        )
     return 0
 
 
+def main(args: Optional[List[str]] = None) -> int:
+    """
+    Run the main program.
+
+    This function is executed when you type `mvodb` or `python -m mvodb`.
+
+    Arguments:
+        args: Arguments passed from the command line.
+
+    Returns:
+        An exit code.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    if args and args[0] == "retemplate":
+        return retemplate(args[1:])
+    if args and args[0] == "tmdb-server":
+        return tmdb_server(args[1:])
+
+    parser = get_parser()
+    args = parser.parse_args(args=args)
+    templates = _get_templates(parser, args)
+
+    server = serve(args.metrics_port) if args.metrics_port is not None else None
+    reporter = Reporter(
+        interval=args.metrics_interval,
+        stream=sys.stderr if args.metrics_interval else None,
+        textfile=args.metrics_file,
+    )
+    reporter.start()
+    try:
+        return _run(args, templates, _get_scheduler(parser, args), _get_provider(args))
+    finally:
+        reporter.stop()
+        if server is not None:
+            server.shutdown()
+
+
+def _get_provider(args: argparse.Namespace) -> TMDBProvider:
+    if args.tmdb_url and not tmdb.API_KEY:
+        tmdb.API_KEY = "unused"  # fixture servers do not check the key, but tmdbsimple requires one
+    if args.tmdb_url == DEFAULT_BASE_URL:
+        return DEFAULT_PROVIDER
+    return TMDBProvider(base_url=args.tmdb_url)
+
+
+def _get_index(args: argparse.Namespace) -> Optional[HashIndex]:
+    if not args.use_index:
+        return None
+    if args.dry_run:
+        # dry runs must not create nor modify anything
+        return HashIndex(args.index, read_only=True) if os.path.exists(args.index) else None
+    return HashIndex(args.index)
+
+
+def _cataloged_files(path: str) -> List[Path]:
+    if not os.path.exists(path):
+        return []
+    catalog = Catalog(path)
+    try:
+        return [Path(item) for item, _ in catalog.items() if os.path.isfile(item)]
+    finally:
+        catalog.close()
+
+
+def _print_estimate(args: argparse.Namespace, moves: List[PlannedMove]) -> None:
+    throughput = {}
+    if args.measure_throughput:
+        for move in moves:
+            if not move.is_rename and move.destination_device not in throughput:
+                directory = existing_ancestor(Path(move.destination).parent)
+                throughput[move.destination_device] = measure_throughput(directory)
+    bandwidth = args.bwlimit * 1e6 if args.bwlimit else None
+    for line in Estimate(moves, throughput, args.throughput * 1e6, bandwidth).report():
+        print(line)
+
+
+def _run(
+    args: argparse.Namespace,
+    templates: PathTemplates,
+    scheduler: MoveScheduler,
+    provider: TMDBProvider,
+) -> int:
+    files = list(scan(args.files))
+
+    if args.duplicates != "ignore":
+        library = _cataloged_files(args.catalog) if args.check_library else []
+        duplicates = find_duplicates(files, library, read_budget=args.read_budget)
+        action = "skipping" if args.duplicates == "skip" else "processing anyway"
+        for file, original in duplicates.items():
+            print(f"'{file}' is a duplicate of '{original}', {action}", file=sys.stderr)
+        if args.duplicates == "skip":
+            files = [file for file in files if file not in duplicates]
+
+    index = _get_index(args)
+    try:
+        guesses = list(resolve_many(parse_many(files), provider, index, args.lookup_workers, args.batch_size))
+        moves = list(plan(guesses, templates))
+        unresolved = [guess for guess in guesses if guess.error is not None]
+        for guess in unresolved:
+            print(f"Could not resolve '{guess.data['filename']}': {guess.error}, skipping", file=sys.stderr)
+
+        if args.estimate:
+            _print_estimate(args, moves)
+
+        if args.dry_run:
+            for move in moves:
+                print(f"mv '{move.source}' '{move.destination}'")
+            return 1 if unresolved else 0
+
+        if not args.no_confirm:
+            moves = [move for move in moves if _confirm(move)]
+
+        catalog = Catalog(args.catalog)
+        moved = _apply(moves, scheduler, catalog, index)
+        if moved:
+            catalog.root = templates.root.absolute()
+        catalog.close()
+    finally:
+        if index is not None:
+            index.close()
+    return 0 if not unresolved and len(moved) == len(moves) else 1
+
+
+def _confirm(move: PlannedMove) -> bool:
+    answer = input(f"mv '{move.source}' '{move.destination}' [Yn] ")  # nosec
+    return answer in ("", "y", "Y")
+
+
 # for each file found
 #   guess components
 #   reduce components to necessary ones only
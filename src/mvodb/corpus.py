@@ -0,0 +1,182 @@
+"""
+Module that contains the regression harness for release names classification.
+
+A corpus is a JSON-lines file of release names with their expected values:
+`type` and `title`, plus `year`, `season`, `episode` (a list for multi-episode files)
+and `date` (in ISO format) when relevant.
+The harness measures how many names are classified correctly, and how fast.
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from guessit import guessit
+
+from mvodb.api import parse_many, resolve_many
+from mvodb.provider import TMDBProvider
+
+_NON_ALNUM = re.compile(r"\W+")
+
+
+def load_corpus(path: Union[str, Path]) -> List[dict]:
+    """
+    Load a corpus.
+
+    Arguments:
+        path: The JSON-lines file.
+
+    Returns:
+        The corpus entries.
+    """
+    with open(path) as stream:
+        return [json.loads(line) for line in stream if line.strip()]
+
+
+def normalize_title(title) -> str:
+    """
+    Normalize a title for comparison, ignoring case and punctuation.
+
+    Arguments:
+        title: The title (guessit may return a list of titles).
+
+    Returns:
+        The normalized title.
+    """
+    if isinstance(title, list):
+        title = " ".join(title)
+    return _NON_ALNUM.sub(" ", str(title).replace("'", "")).strip().casefold()
+
+
+def _differences(data: dict, entry: dict) -> List[str]:
+    differences = []
+    for field, expected in entry.items():
+        if field == "name":
+            continue
+        actual = data.get(field)
+        if field == "title":
+            expected, actual = normalize_title(expected), normalize_title(actual)
+        elif field == "year" and actual is not None:
+            actual = int(actual)
+        elif field == "date" and actual is not None:
+            actual = actual.isoformat()
+        if actual != expected:
+            differences.append(f"{field}: expected {expected!r}, got {actual!r}")
+    return differences
+
+
+class Report:
+    """The accuracy and speed of a harness run."""
+
+    def __init__(self, total: int, failures: Dict[str, str], seconds: float):
+        """
+        Initialize the report.
+
+        Arguments:
+            total: The number of names processed.
+            failures: A description of what went wrong, for each misclassified name.
+            seconds: The time spent processing names.
+        """
+        self.total = total
+        self.failures = failures
+        self.seconds = seconds
+
+    @property
+    def accuracy(self) -> float:
+        """
+        Return the ratio of names classified correctly.
+
+        Returns:
+            A ratio between 0 and 1.
+        """
+        if not self.total:
+            return 1.0
+        return 1 - len(self.failures) / self.total
+
+    @property
+    def names_per_second(self) -> float:
+        """
+        Return the processing speed.
+
+        Returns:
+            The number of names processed per second.
+        """
+        return self.total / self.seconds if self.seconds else float("inf")
+
+    def summary(self) -> str:
+        """
+        Summarize the report in one line.
+
+        Returns:
+            The summary.
+        """
+        return f"{self.total} names, accuracy {self.accuracy:.2%}, {self.names_per_second:.0f} names/sec"
+
+
+def evaluate_parse(entries: Iterable[dict]) -> Report:
+    """
+    Parse release names, without any network access, and compare them to the expected values.
+
+    Guessit is initialized before starting the clock, so that its setup does not count in the speed.
+
+    Arguments:
+        entries: The corpus entries.
+
+    Returns:
+        A report.
+    """
+    entries = list(entries)
+    if entries:
+        guessit(entries[0]["name"])
+    start = time.perf_counter()
+    guesses = list(parse_many(entry["name"] for entry in entries))
+    seconds = time.perf_counter() - start
+    failures = {}
+    for entry, guess in zip(entries, guesses):
+        differences = _differences(guess.data, entry)
+        if differences:
+            failures[entry["name"]] = ", ".join(differences)
+    return Report(len(entries), failures, seconds)
+
+
+def evaluate_pipeline(entries: Iterable[dict], provider: TMDBProvider, workers: int = 4) -> Report:
+    """
+    Parse and resolve release names, and compare the best matches to the expected values.
+
+    Subtitles are left out, since detecting their language requires the actual files.
+    Names that cannot be looked up, like absolute or date-based episode numbers, count as failures.
+
+    Arguments:
+        entries: The corpus entries.
+        provider: The provider to resolve names with, usually backed by recorded responses.
+        workers: Number of concurrent lookups.
+
+    Returns:
+        A report.
+    """
+    entries = [entry for entry in entries if not entry["name"].endswith(".srt")]
+    start = time.perf_counter()
+    guesses = list(parse_many(entry["name"] for entry in entries))
+    list(resolve_many(guesses, provider, workers=workers))
+    seconds = time.perf_counter() - start
+    failures = {}
+    for entry, guess in zip(entries, guesses):
+        match: Optional[dict] = None
+        if guess.error is None and guess.data.get("matches"):
+            match = guess.get_match()
+            if guess.is_episode:
+                match["title"] = match.pop("tvshow")
+        if match is None:
+            failures[entry["name"]] = f"not resolved: {guess.error or 'no match found'}"
+            continue
+        expected = {
+            field: value for field, value in entry.items() if field in {"type", "title", "year", "season", "episode"}
+        }
+        if guess.is_episode:
+            expected.pop("year", None)
+        differences = _differences(match, expected)
+        if differences:
+            failures[entry["name"]] = ", ".join(differences)
+    return Report(len(entries), failures, seconds)
@@ -0,0 +1,142 @@
+"""Module that contains the duplicate detection functions."""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from mvodb.fingerprint import opensubtitles_hash
+
+READ_SIZE = 1024 * 1024
+"""Number of bytes read at once when hashing a whole file."""
+
+
+def full_hash(path: Path, read_size: int = READ_SIZE) -> str:
+    """
+    Compute the hash of the whole contents of a file.
+
+    Arguments:
+        path: The file to hash.
+        read_size: Number of bytes read at once.
+
+    Returns:
+        A hexadecimal digest.
+    """
+    digest = hashlib.blake2b()
+    with open(path, "rb") as stream:
+        for block in iter(lambda: stream.read(read_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_files(root: Path, extensions: Sequence[str]) -> Iterator[Path]:
+    """
+    Recursively yield the files of a directory having one of the given extensions.
+
+    Arguments:
+        root: The directory to walk.
+        extensions: The accepted extensions, without dots.
+
+    Yields:
+        File paths.
+    """
+    for entry in os.scandir(root):
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_files(Path(entry.path), extensions)
+        elif os.path.splitext(entry.name)[1][1:].lower() in extensions:
+            yield Path(entry.path)
+
+
+class _ReadBudget:
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.lock = threading.Lock()
+
+    def take(self, size: int) -> bool:
+        if self.limit is None:
+            return True
+        with self.lock:
+            if size > self.limit:
+                return False
+            self.limit -= size
+            return True
+
+
+def _refine(
+    groups: Iterable[List[Path]],
+    key: Callable[[Path], Optional[str]],
+    executor: ThreadPoolExecutor,
+) -> List[List[Path]]:
+    groups = list(groups)
+    keys = iter(executor.map(key, [path for group in groups for path in group]))
+    refined = []
+    for group in groups:
+        subgroups: Dict[str, List[Path]] = {}
+        for path in group:
+            path_key = next(keys)
+            if path_key is not None:
+                subgroups.setdefault(path_key, []).append(path)
+        refined.extend(subgroup for subgroup in subgroups.values() if len(subgroup) > 1)
+    return refined
+
+
+def find_duplicates(
+    sources: Sequence[Path],
+    library: Sequence[Path] = (),
+    workers: int = 4,
+    read_budget: Optional[int] = None,
+) -> Dict[Path, Path]:
+    """
+    Find source files that are copies of other source or library files.
+
+    Files are first grouped by size, then by partial hash
+    (see [`opensubtitles_hash`][mvodb.fingerprint.opensubtitles_hash]),
+    and only files still sharing a group get their whole contents hashed.
+    Hashes are computed by `workers` threads. When `read_budget` is given,
+    whole-file hashing stops once that many bytes were read,
+    and the remaining candidates are not reported.
+    Paths to the same file (hard links, or a relative and an absolute path) are not duplicates.
+
+    Arguments:
+        sources: The files about to be processed.
+        library: Files already organized, never reported as duplicates.
+        workers: Number of threads reading files.
+        read_budget: Maximum number of bytes read to hash whole files.
+
+    Returns:
+        A mapping from each duplicate source file to the file it duplicates.
+        Library files are preferred as originals, then the first source file.
+    """
+    order: Dict[Path, int] = {}
+    identities = set()
+    by_size: Dict[int, List[Path]] = {}
+    for path in [*library, *sources]:
+        stat = path.stat()
+        identity = (stat.st_dev, stat.st_ino)
+        if identity not in identities:
+            identities.add(identity)
+            order[path] = len(order)
+            by_size.setdefault(stat.st_size, []).append(path)
+    source_set = set(sources)
+    candidates = [group for group in by_size.values() if len(group) > 1 and source_set.intersection(group)]
+
+    budget = _ReadBudget(read_budget)
+
+    def budgeted_full_hash(path: Path) -> Optional[str]:  # noqa: WPS430 (nested function)
+        if budget.take(path.stat().st_size):
+            return full_hash(path)
+        return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for key in (opensubtitles_hash, budgeted_full_hash):
+            candidates = [group for group in _refine(candidates, key, executor) if source_set.intersection(group)]
+
+    duplicates = {}
+    for group in candidates:
+        original, *copies = sorted(group, key=order.__getitem__)
+        for copy in copies:
+            if copy in source_set:
+                duplicates[copy] = original
+    return duplicates
@@ -0,0 +1,180 @@
+"""Module that contains the classification and cost estimation of planned moves."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+DEFAULT_THROUGHPUT = 100 * 1000 * 1000
+"""Default copy throughput, in bytes per second."""
+
+MEASURE_SIZE = 64 * 1024 * 1024
+"""Number of bytes written to measure the throughput of a device."""
+
+
+def existing_ancestor(path: Union[str, Path]) -> Path:
+    """
+    Return the path itself if it exists, or its nearest existing parent.
+
+    Arguments:
+        path: A path, existing or not.
+
+    Returns:
+        An existing path.
+    """
+    path = Path(path).absolute()
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    return path
+
+
+class PlannedMove:
+    """A move, with the file information needed to schedule it."""
+
+    __slots__ = (
+        "source",
+        "destination",
+        "metadata",
+        "file_hash",
+        "size",
+        "inode",
+        "source_device",
+        "destination_device",
+    )
+
+    def __init__(
+        self,
+        source: Union[str, Path],
+        destination: Union[str, Path],
+        metadata: Optional[dict] = None,
+        file_hash: Optional[str] = None,
+    ):
+        """
+        Initialize the move, reading information from the file system.
+
+        Arguments:
+            source: The file to move.
+            destination: Where to move it. Its directory does not have to exist yet.
+            metadata: The metadata used to compute the destination.
+            file_hash: The [hash][mvodb.fingerprint.opensubtitles_hash] of the file.
+        """
+        stat = os.stat(source)
+        self.source = str(source)
+        self.destination = str(destination)
+        self.metadata = metadata
+        self.file_hash = file_hash
+        self.size = stat.st_size
+        self.inode = stat.st_ino
+        self.source_device = stat.st_dev
+        self.destination_device = os.stat(existing_ancestor(Path(destination).parent)).st_dev
+
+    def __repr__(self):
+        return f"PlannedMove({self.source!r}, {self.destination!r})"
+
+    @property
+    def is_rename(self) -> bool:
+        """Whether the move is a same-device rename, rather than a copy."""
+        return self.source_device == self.destination_device
+
+
+def measure_throughput(directory: Union[str, Path], size: int = MEASURE_SIZE) -> float:
+    """
+    Measure the write throughput of the device containing a directory.
+
+    A temporary file is written, synced, then removed.
+
+    Arguments:
+        directory: An existing directory on the device to measure.
+        size: Number of bytes to write.
+
+    Returns:
+        The throughput, in bytes per second.
+    """
+    block = os.urandom(1024 * 1024)
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=".mvodb-throughput-") as stream:
+        start = time.perf_counter()
+        for _ in range(0, size, len(block)):
+            stream.write(block)
+        stream.flush()
+        os.fsync(stream.fileno())
+        elapsed = time.perf_counter() - start
+    return size / elapsed
+
+
+class Estimate:
+    """The estimated cost of a set of planned moves."""
+
+    def __init__(
+        self,
+        moves: Iterable[PlannedMove],
+        throughput: Optional[Dict[int, float]] = None,
+        default_throughput: float = DEFAULT_THROUGHPUT,
+        bandwidth: Optional[float] = None,
+    ):
+        """
+        Initialize the estimate.
+
+        Arguments:
+            moves: The planned moves.
+            throughput: Copy throughput in bytes per second, for each destination device.
+            default_throughput: Copy throughput in bytes per second, for other devices.
+            bandwidth: Maximum total throughput of copies in bytes per second, as set on the scheduler.
+        """
+        throughput = throughput or {}
+        self.bandwidth = bandwidth
+        self.renames = 0
+        self.copies = 0
+        self.bytes_to_copy: Dict[int, int] = {}
+        for move in moves:
+            if move.is_rename:
+                self.renames += 1
+            else:
+                self.copies += 1
+                device = move.destination_device
+                self.bytes_to_copy[device] = self.bytes_to_copy.get(device, 0) + move.size
+        self.seconds: Dict[int, float] = {
+            device: size / min(throughput.get(device, default_throughput), bandwidth or float("inf"))
+            for device, size in self.bytes_to_copy.items()
+        }
+
+    @property
+    def total_seconds(self) -> float:
+        """
+        The estimated duration of all moves.
+
+        Copies to different devices run concurrently, like in the scheduler,
+        but all of them share the bandwidth cap.
+        """
+        longest = max(self.seconds.values(), default=0)
+        if not self.bandwidth:
+            return longest
+        return max(longest, sum(self.bytes_to_copy.values()) / self.bandwidth)
+
+    def report(self) -> List[str]:
+        """
+        Describe the estimate.
+
+        Returns:
+            Lines of text.
+        """
+        lines = [f"{self.renames + self.copies} moves: {self.renames} renames, {self.copies} copies"]
+        for device, size in sorted(self.bytes_to_copy.items()):
+            lines.append(f"device {device}: {_human_size(size)} to copy, about {_human_duration(self.seconds[device])}")
+        lines.append(f"estimated duration: {_human_duration(self.total_seconds)}")
+        return lines
+
+
+def _human_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1000:
+            return f"{size:.1f} {unit}"
+        size /= 1000
+    return f"{size:.1f} TB"
+
+
+def _human_duration(seconds: float) -> str:
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    parts: List[Tuple[int, str]] = [(hours, "h"), (minutes, "min"), (seconds, "s")]
+    return " ".join(f"{value}{unit}" for value, unit in parts if value) or "0s"
@@ -0,0 +1,112 @@
+"""Module that contains the file fingerprinting functions and the local hash index."""
+
+import json
+import os
+import sqlite3
+import struct
+from pathlib import Path
+from typing import Optional, Union
+
+from mvodb.paths import data_path
+
+CHUNK_SIZE = 65536
+"""Size of the chunks read at the start and end of a file (64 KiB)."""
+
+HASH_MASK = 0xFFFFFFFFFFFFFFFF  # noqa: WPS432 (64 bits)
+
+
+def _pread(fd: int, size: int, offset: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def _sum_words(chunk: bytes) -> int:
+    count = len(chunk) // 8
+    return sum(struct.unpack(f"<{count}Q", chunk[: count * 8]))
+
+
+def opensubtitles_hash(path: Union[str, Path]) -> str:
+    """
+    Compute the OpenSubtitles hash of a file.
+
+    The hash is the file size plus the sum of the little-endian 64-bit words
+    of its first and last 64 KiB, so its cost does not depend on the file size.
+
+    Arguments:
+        path: The file to hash.
+
+    Returns:
+        The hash as 16 hexadecimal characters.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        head = _pread(fd, CHUNK_SIZE, 0)
+        tail = _pread(fd, CHUNK_SIZE, max(0, size - CHUNK_SIZE))
+    finally:
+        os.close(fd)
+    return f"{(size + _sum_words(head) + _sum_words(tail)) & HASH_MASK:016x}"
+
+
+def default_index_path() -> Path:
+    """
+    Return the default location of the hash index.
+
+    Returns:
+        A path in the user data directory.
+    """
+    return data_path("hashes.db")
+
+
+class HashIndex:
+    """A local index mapping file hashes to already resolved metadata."""
+
+    def __init__(self, path: Union[str, Path], read_only: bool = False):
+        """
+        Initialize the index.
+
+        Arguments:
+            path: The SQLite database file, created if it does not exist, unless read-only.
+            read_only: Whether to open an existing index without modifying it.
+        """
+        if read_only:
+            self.connection = sqlite3.connect(f"{Path(path).absolute().as_uri()}?mode=ro", uri=True)
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute("CREATE TABLE IF NOT EXISTS hashes (hash TEXT PRIMARY KEY, metadata TEXT NOT NULL)")
+
+    def get(self, file_hash: str) -> Optional[dict]:
+        """
+        Return the metadata resolved for a hash.
+
+        Arguments:
+            file_hash: A hash returned by [`opensubtitles_hash`][mvodb.fingerprint.opensubtitles_hash].
+
+        Returns:
+            The metadata, or None if the hash is unknown.
+        """
+        row = self.connection.execute("SELECT metadata FROM hashes WHERE hash = ?", (file_hash,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def add(self, file_hash: str, metadata: dict) -> None:
+        """
+        Record the metadata resolved for a hash.
+
+        Arguments:
+            file_hash: A hash returned by [`opensubtitles_hash`][mvodb.fingerprint.opensubtitles_hash].
+            metadata: The resolved metadata.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO hashes (hash, metadata) VALUES (?, ?)",
+                (file_hash, json.dumps(metadata)),
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.connection.close()
@@ -0,0 +1,94 @@
+"""Module that contains the guesses made from file names."""
+
+import threading
+
+from guessit import guessit
+from langdetect import detect, detector_factory
+from langdetect.lang_detect_exception import LangDetectException
+
+from mvodb.metrics import GUESSES
+from mvodb.provider import DEFAULT_PROVIDER
+from mvodb.templates import PathTemplates
+
+LANG = {"English": "eng", "French": "fre"}
+_RELATIVE_TEMPLATES = PathTemplates()
+_LANGDETECT_LOCK = threading.Lock()
+
+
+def _detect(text):
+    # langdetect publishes its global factory before loading its profiles,
+    # so concurrent first calls could fail with "Need to load profiles"
+    with _LANGDETECT_LOCK:
+        detector_factory.init_factory()
+    return detect(text)
+
+
+class Guess:
+    def __init__(self, name):
+        GUESSES.inc()
+        self.data = guessit(name)
+        self.data["filename"] = name
+        self.data["ext"] = name.split(".")[-1]
+        self.error = None
+
+    def __hash__(self):
+        if self.is_movie:
+            return hash(("movie", self.data["title"], self.data["year"]))
+        elif self.is_episode:
+            return hash(("movie", self.data["title"], self.data["season"], self.data["episode"]))
+        return hash("unknown")
+
+    def __eq__(self, other):
+        return hash(self) == hash(other)
+
+    @property
+    def is_episode(self):
+        return self.data["type"] == "episode"
+
+    @property
+    def is_movie(self):
+        return self.data["type"] == "movie"
+
+    def detect_language(self):
+        if self.data["ext"] == "srt":
+            try:
+                self.data["lang"] = self.data["subtitle_language"].alpha3
+            except (KeyError, AttributeError):
+                with open(self.data["filename"]) as stream:
+                    text = stream.read()
+                if text:
+                    try:
+                        self.data["lang"] = _detect(text)
+                    except LangDetectException:
+                        pass
+
+    def fetch(self, provider=None):
+        provider = provider or DEFAULT_PROVIDER
+        self.detect_language()
+        if self.is_episode:
+            self.data["matches"] = provider.get_episode_matches(
+                self.data["title"], self.data["season"], self.data["episode"]
+            )
+        elif self.is_movie:
+            self.data["matches"] = provider.get_movie_matches(self.data["title"])
+        else:
+            raise ValueError
+
+    def resolve(self, metadata):
+        self.detect_language()
+        self.data["type"] = metadata["type"]
+        self.data["matches"] = [metadata]
+
+    def get_match(self, match_index=0):
+        matches = self.data.get("matches") or []
+        if match_index >= len(matches):
+            raise LookupError("no match found")
+        match = dict(matches[match_index])
+        match["type"] = self.data["type"]
+        match["ext"] = self.data["ext"]
+        if self.data.get("lang"):
+            match["lang"] = self.data["lang"]
+        return match
+
+    def get_new_path(self, match_index=0, templates=_RELATIVE_TEMPLATES):
+        return templates.relative(self.get_match(match_index))
@@ -0,0 +1,409 @@
+"""Module that contains the metrics collected while processing files."""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from typing import IO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf"))
+"""Default upper bounds of histogram buckets, in seconds."""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+    def snapshot(self) -> object:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A value that can only increase."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        """
+        Initialize the counter.
+
+        Arguments:
+            name: The metric name.
+            documentation: The metric description.
+            labels: The label names.
+        """
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Increase the counter.
+
+        Arguments:
+            amount: The increment.
+            **labels: The label values.
+        """
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        """
+        Return the value of the counter.
+
+        Arguments:
+            **labels: The label values.
+
+        Returns:
+            The current value.
+        """
+        return self.values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        """
+        Render the counter in the Prometheus text format.
+
+        Returns:
+            Lines of text.
+        """
+        with self.lock:
+            values = sorted(self.values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in values]
+
+    def snapshot(self) -> Union[float, Dict[str, float]]:
+        """
+        Return the values of the counter.
+
+        Returns:
+            The value, or the values indexed by comma-separated label values.
+        """
+        with self.lock:
+            if not self.labels:
+                return self.values.get((), 0)
+            return {",".join(key): value for key, value in sorted(self.values.items())}
+
+
+class Histogram(_Metric):
+    """A distribution of observed values, counted in buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize the histogram.
+
+        Arguments:
+            name: The metric name.
+            documentation: The metric description.
+            labels: The label names.
+            buckets: The upper bounds of the buckets, the last one being infinity.
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record a value.
+
+        Arguments:
+            value: The observed value.
+            **labels: The label values.
+        """
+        key = self._key(labels)
+        with self.lock:
+            counts = self.counts.setdefault(key, [0] * len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self.sums[key] = self.sums.get(key, 0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """
+        Observe the duration of a block of code.
+
+        Arguments:
+            **labels: The label values.
+
+        Yields:
+            Nothing.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        """
+        Render the histogram in the Prometheus text format.
+
+        Returns:
+            Lines of text.
+        """
+        lines = []
+        with self.lock:
+            items = sorted((key, list(counts), self.sums[key]) for key, counts in self.counts.items())
+        for key, counts, total in items:
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labels, key, f'le="{_format_bound(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {counts[-1]}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the count and sum of observed values.
+
+        Returns:
+            Counts and sums indexed by comma-separated label values.
+        """
+        with self.lock:
+            return {
+                ",".join(key): {"count": counts[-1], "sum": self.sums[key]}
+                for key, counts in sorted(self.counts.items())
+            }
+
+
+class Registry:
+    """A collection of metrics."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self.metrics: List[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        """
+        Create and register a counter.
+
+        Arguments:
+            name: The metric name.
+            documentation: The metric description.
+            labels: The label names.
+
+        Returns:
+            The counter.
+        """
+        metric = Counter(name, documentation, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        Create and register a histogram.
+
+        Arguments:
+            name: The metric name.
+            documentation: The metric description.
+            labels: The label names.
+            buckets: The upper bounds of the buckets, the last one being infinity.
+
+        Returns:
+            The histogram.
+        """
+        metric = Histogram(name, documentation, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text format.
+
+        Returns:
+            The exposition text.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        Return the current values of all metrics.
+
+        Returns:
+            Values indexed by metric name.
+        """
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+    def write_textfile(self, path: Union[str, Path]) -> None:
+        """
+        Atomically write all metrics to a file, for the node exporter textfile collector.
+
+        Arguments:
+            path: The destination file.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as stream:
+            stream.write(self.render())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = Registry()
+"""The default registry."""
+
+FILES_SCANNED = REGISTRY.counter("mvodb_files_scanned_total", "Files found in the given paths.")
+GUESSES = REGISTRY.counter("mvodb_guesses_total", "File names parsed with guessit.")
+TMDB_REQUESTS = REGISTRY.counter("mvodb_tmdb_requests_total", "Requests sent to TMDB.", ["endpoint"])
+TMDB_RETRIES = REGISTRY.counter("mvodb_tmdb_retries_total", "Requests sent to TMDB again after an error.", ["endpoint"])
+CACHE_HITS = REGISTRY.counter("mvodb_cache_hits_total", "Lookups answered from a local cache.", ["cache"])
+CACHE_MISSES = REGISTRY.counter("mvodb_cache_misses_total", "Lookups not found in a local cache.", ["cache"])
+COALESCED_LOOKUPS = REGISTRY.counter(
+    "mvodb_coalesced_lookups_total", "Lookups that waited for an identical lookup in flight.", ["cache"]
+)
+BYTES_MOVED = REGISTRY.counter("mvodb_bytes_moved_total", "Bytes of moved files.", ["method"])
+STAGE_SECONDS = REGISTRY.histogram(
+    "mvodb_stage_duration_seconds",
+    "Duration of each processing stage (guess, hash, fetch, move) for one file.",
+    ["stage"],
+)
+
+
+def cache_hit_rate() -> Optional[float]:
+    """
+    Return the ratio of cache hits over all cache lookups.
+
+    Returns:
+        The hit rate, or None if no lookup was done.
+    """
+    hits = sum(CACHE_HITS.values.values())
+    misses = sum(CACHE_MISSES.values.values())
+    if hits + misses == 0:
+        return None
+    return hits / (hits + misses)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def serve(port: int, address: str = "127.0.0.1", registry: Registry = REGISTRY) -> HTTPServer:
+    """
+    Serve the metrics over HTTP, in a background thread.
+
+    Arguments:
+        port: The port to listen on.
+        address: The address to bind.
+        registry: The registry to expose.
+
+    Returns:
+        The running server. Call its `shutdown` method to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):  # noqa: WPS431 (nested class)
+        def do_GET(self):  # noqa: N802 (imposed by the base class)
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # noqa: WPS110 (imposed by the base class)
+            """Do not log requests."""
+
+    server = _ThreadingHTTPServer((address, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Reporter:
+    """Periodically write metrics as JSON lines and to a Prometheus text file."""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        stream: Optional[IO[str]] = None,
+        textfile: Optional[Union[str, Path]] = None,
+        registry: Registry = REGISTRY,
+    ):
+        """
+        Initialize the reporter.
+
+        Arguments:
+            interval: Seconds between two reports. Without interval, only the final report is written.
+            stream: Where to write JSON lines. Without stream, no JSON line is written.
+            textfile: Where to write the Prometheus text file. Without path, no file is written.
+            registry: The registry to report.
+        """
+        self.interval = interval
+        self.stream = stream
+        self.textfile = textfile
+        self.registry = registry
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def report(self) -> None:
+        """Write a report now."""
+        if self.stream is not None:
+            line = {"time": time.time(), "cache_hit_rate": cache_hit_rate(), **self.registry.snapshot()}
+            self.stream.write(json.dumps(line) + "\n")
+            self.stream.flush()
+        if self.textfile is not None:
+            self.registry.write_textfile(self.textfile)
+
+    def start(self) -> None:
+        """Start reporting periodically, in a background thread."""
+        if self.interval:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop reporting periodically, and write a final report."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.report()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.report()
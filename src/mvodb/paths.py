@@ -0,0 +1,18 @@
+"""Module that contains the locations of the files mvodb keeps between runs."""
+
+import os
+from pathlib import Path
+
+
+def data_path(filename: str) -> Path:
+    """
+    Return the location of a data file.
+
+    Arguments:
+        filename: The name of the file.
+
+    Returns:
+        A path in the mvodb directory of the user data directory (`$XDG_DATA_HOME`, or `~/.local/share`).
+    """
+    data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(data_home) / "mvodb" / filename
@@ -0,0 +1,47 @@
+"""Module that contains the prefetch planner for batches of episodes."""
+
+from typing import Dict, Iterable, Optional, Set
+
+import requests
+
+from mvodb.provider import DEFAULT_PROVIDER, TMDBProvider
+
+
+def plan_prefetch(guesses: Iterable) -> Dict[str, Set[int]]:
+    """
+    Group the seasons present in a batch of guesses by show title.
+
+    Arguments:
+        guesses: The guesses to plan for (see [`Guess`][mvodb.guess.Guess]).
+
+    Returns:
+        The season numbers to load, for each distinct show title.
+    """
+    plan: Dict[str, Set[int]] = {}
+    for guess in guesses:
+        if not guess.is_episode:
+            continue
+        season = guess.data.get("season")
+        if isinstance(season, int) and guess.data.get("title"):
+            plan.setdefault(guess.data["title"], set()).add(season)
+    return plan
+
+
+def prefetch(plan: Dict[str, Set[int]], provider: Optional[TMDBProvider] = None) -> None:
+    """
+    Search each show once and bulk-load its seasons.
+
+    Once done, episode lookups for these seasons no longer hit the network.
+    Shows failing to load are skipped: their episodes are looked up one season at a time later.
+
+    Arguments:
+        plan: The plan returned by [`plan_prefetch`][mvodb.prefetch.plan_prefetch].
+        provider: The provider loading and caching seasons (default: the default provider).
+    """
+    provider = provider or DEFAULT_PROVIDER
+    for title, seasons in plan.items():
+        try:
+            for tv_show in provider.search_tv(title):
+                provider.prefetch_seasons(tv_show["id"], seasons)
+        except requests.RequestException:
+            continue
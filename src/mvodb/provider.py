@@ -0,0 +1,235 @@
+"""Module that contains the provider fetching metadata from TMDB."""
+
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+import tmdbsimple as tmdb
+
+from mvodb.cache import MISSING, LRUCache, Memo, SingleFlight
+from mvodb.metrics import TMDB_REQUESTS, TMDB_RETRIES
+
+tmdb.API_KEY = os.environ.get("TMDB_API_KEY")
+
+DEFAULT_BASE_URL = os.environ.get("TMDB_BASE_URL")
+"""Base URL of the TMDB API, when not the official one, for example a [fixture server][mvodb.recorded.FixtureServer]."""
+
+APPEND_LIMIT = 20
+"""Maximum number of sub-requests TMDB accepts in `append_to_response`."""
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+"""HTTP status codes of the responses worth retrying."""
+
+
+def _episode_names(episodes: Iterable[dict]) -> Dict[int, str]:
+    return {episode["episode_number"]: episode["name"] for episode in episodes}
+
+
+def _retry_after(error: requests.RequestException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+def _is_retryable(error: requests.RequestException) -> bool:
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code in RETRY_STATUSES
+
+
+class TMDBProvider:
+    """
+    A metadata provider backed by TMDB, with its own caches.
+
+    Keep an instance around to reuse its warm caches across batches.
+    """
+
+    def __init__(  # noqa: WPS211 (too many arguments)
+        self,
+        cache_size: Optional[int] = 1024,
+        session=None,
+        base_url: Optional[str] = DEFAULT_BASE_URL,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_delay: float = 60,
+    ):
+        """
+        Initialize the provider.
+
+        Arguments:
+            cache_size: The maximum number of cached results per kind of lookup, and of loaded seasons,
+                or None for unbounded caches.
+            session: The `requests` session sending requests (default: the `tmdbsimple` one),
+                for example a [`RecordedSession`][mvodb.recorded.RecordedSession].
+            base_url: The base URL of the TMDB API, including the version (default: the official one).
+            retries: Number of times a request is sent again after a connection error,
+                a server error or a rate limit error.
+            backoff: Seconds to wait before the first retry, doubled at each retry,
+                unless the response tells how long to wait with a `Retry-After` header.
+            max_delay: Maximum number of seconds to wait before a retry.
+        """
+        self.session = session
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.retries = retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.seasons = LRUCache(cache_size, "seasons")
+        self._season_flight = SingleFlight()
+        self._tv_searches = Memo(cache_size, "search_tv")
+        self._episode_matches = Memo(cache_size, "episode_matches")
+        self._movie_matches = Memo(cache_size, "movie_matches")
+
+    def search_tv(self, title: str) -> List[dict]:
+        """
+        Search TV shows by title.
+
+        Arguments:
+            title: The title to search.
+
+        Returns:
+            The three best results.
+        """
+        return self._tv_searches.get(title, lambda: self._search_tv(title))
+
+    def get_season_episodes(self, show_id: int, season_number: int) -> Dict[int, str]:
+        """
+        Return the episode names of a season, loading it if needed.
+
+        Arguments:
+            show_id: The TMDB identifier of the show.
+            season_number: The season number.
+
+        Returns:
+            Episode names indexed by episode number.
+        """
+        key = (show_id, season_number)
+        episodes = self.seasons.get(key)
+        if episodes is not MISSING:
+            return episodes
+        return self._season_flight.do(key, lambda: self._load_season(show_id, season_number))
+
+    def prefetch_seasons(self, show_id: int, season_numbers: Iterable[int]) -> None:
+        """
+        Bulk-load the episode names of several seasons of a show.
+
+        Seasons are appended to the show request, so that at most one request
+        is sent for every twenty seasons not loaded yet.
+
+        Arguments:
+            show_id: The TMDB identifier of the show.
+            season_numbers: The season numbers to load.
+        """
+        missing = sorted({number for number in season_numbers if (show_id, number) not in self.seasons})
+        for start in range(0, len(missing), APPEND_LIMIT):
+            batch = missing[start : start + APPEND_LIMIT]
+            show = self._tmdb(tmdb.TV, show_id)
+            appended = ",".join(f"season/{number}" for number in batch)
+            response = self._send("tv", show.info, append_to_response=appended)
+            for number in batch:
+                season = response.get(f"season/{number}") or {}
+                self.seasons.set((show_id, number), _episode_names(season.get("episodes", [])))
+
+    def get_episode_matches(self, title: str, season_number: int, episode_number: int) -> List[dict]:
+        """
+        Return the episodes matching a show title, season and episode numbers.
+
+        Arguments:
+            title: The show title.
+            season_number: The season number.
+            episode_number: The episode number.
+
+        Returns:
+            Matches for the three best shows having this episode.
+        """
+        key = (title, season_number, episode_number)
+        return self._episode_matches.get(key, lambda: self._find_episodes(title, season_number, episode_number))
+
+    def get_movie_matches(self, title: str) -> List[dict]:
+        """
+        Return the movies matching a title.
+
+        Arguments:
+            title: The movie title.
+
+        Returns:
+            The three best matches.
+        """
+        return self._movie_matches.get(title, lambda: self._search_movie(title))
+
+    def _tmdb(self, cls, *args):
+        resource = cls(*args)
+        if self.session is not None:
+            resource.session = self.session
+        if self.base_url is not None:
+            resource.base_uri = self.base_url
+        return resource
+
+    def _send(self, endpoint: str, request: Callable, **params) -> dict:
+        attempt = 0
+        while True:
+            TMDB_REQUESTS.inc(endpoint=endpoint)
+            try:
+                return request(**params)
+            except requests.RequestException as error:
+                if attempt >= self.retries or not _is_retryable(error):
+                    raise
+                delay = _retry_after(error)
+                if delay is None:
+                    delay = self.backoff * 2**attempt
+            attempt += 1
+            TMDB_RETRIES.inc(endpoint=endpoint)
+            time.sleep(min(delay, self.max_delay))
+
+    def _search_tv(self, title: str) -> List[dict]:
+        search = self._tmdb(tmdb.Search)
+        self._send("search/tv", search.tv, query=title)
+        return search.results[:3]
+
+    def _load_season(self, show_id: int, season_number: int) -> Dict[int, str]:
+        key = (show_id, season_number)
+        episodes = self.seasons.peek(key)
+        if episodes is MISSING:
+            season = self._tmdb(tmdb.TV_Seasons, show_id, season_number)
+            self._send("tv/season", season.info)
+            episodes = _episode_names(season.episodes)
+            self.seasons.set(key, episodes)
+        return episodes
+
+    def _find_episodes(self, title: str, season_number: int, episode_number: int) -> List[dict]:
+        results = []
+        for tv_show in self.search_tv(title):
+            episodes = self.get_season_episodes(tv_show["id"], season_number)
+            if episode_number not in episodes:
+                continue
+            results.append(
+                {
+                    "tvshow": tv_show["name"],
+                    "season": season_number,
+                    "episode": episode_number,
+                    "title": episodes[episode_number],
+                }
+            )
+        return results
+
+    def _search_movie(self, title: str) -> List[dict]:
+        search = self._tmdb(tmdb.Search)
+        self._send("search/movie", search.movie, query=title)
+        results = []
+        for movie in search.results[:3]:
+            results.append(
+                {
+                    "title": movie["title"],
+                    "year": movie["release_date"].split("-")[0],
+                }
+            )
+        return results
+
+
+DEFAULT_PROVIDER = TMDBProvider()
+"""The provider used when none is given."""
@@ -0,0 +1,329 @@
+"""
+Module that contains recorded TMDB responses, replayed without network access.
+
+A store is a JSON object mapping requests to responses. Requests are written as a path, relative
+to the API version, followed by their sorted query parameters (see [`request_key`][mvodb.recorded.request_key]):
+
+```json
+{
+  "/search/tv?query=the wire": {"page": 1, "results": [{"id": 1438, "name": "The Wire"}]},
+  "/tv/1438/season/1": {"season_number": 1, "episodes": [{"episode_number": 1, "name": "The Target"}]}
+}
+```
+
+Stores are replayed in-process by a [`RecordedSession`][mvodb.recorded.RecordedSession],
+or over HTTP by a [`FixtureServer`][mvodb.recorded.FixtureServer] (see `mvodb tmdb-server --help`).
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from typing import Dict, Mapping, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from mvodb.throttle import TokenBucket
+
+IGNORED_PARAMS = frozenset(("api_key", "language"))
+"""Query parameters not taken into account to match requests."""
+
+_VERSION_PREFIX = re.compile(r"^/\d+(?=/)")
+_SHOW_PATH = re.compile(r"^/tv/\d+$")
+_EPISODE_PATH = re.compile(r"^(/tv/\d+/season/\d+)/episode/(\d+)$")
+
+
+def request_key(path: str, params: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Return the key of a request in a store.
+
+    The API version prefix and authentication are dropped, and searches are case-insensitive, like on TMDB.
+
+    Arguments:
+        path: The request path, with or without the version prefix.
+        params: The query parameters.
+
+    Returns:
+        The normalized request.
+    """
+    path = _VERSION_PREFIX.sub("", path.rstrip("/"))
+    query = {key: str(value) for key, value in (params or {}).items() if key not in IGNORED_PARAMS}
+    if "query" in query:
+        query["query"] = query["query"].casefold()
+    if not query:
+        return path
+    return path + "?" + "&".join(f"{key}={value}" for key, value in sorted(query.items()))
+
+
+class RecordedStore:
+    """Recorded TMDB responses."""
+
+    def __init__(self, responses: Dict[str, dict]):
+        """
+        Initialize the store.
+
+        Arguments:
+            responses: Responses indexed by request key.
+        """
+        self.responses = {request_key(*self._split(key)): response for key, response in responses.items()}
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "RecordedStore":
+        """
+        Load a store from a JSON file.
+
+        Arguments:
+            path: The JSON file.
+
+        Returns:
+            A store.
+        """
+        with open(path) as stream:
+            return cls(json.load(stream))
+
+    def get(self, path: str, params: Optional[Mapping[str, str]] = None) -> Tuple[int, dict]:
+        """
+        Return the recorded response to a request.
+
+        Searches without recorded response return no results. Seasons appended to show requests,
+        and single episodes, are taken from the recorded seasons, as TMDB would do.
+
+        Arguments:
+            path: The request path, with or without the version prefix.
+            params: The query parameters.
+
+        Returns:
+            An HTTP status code and a JSON body.
+        """
+        key = request_key(path, params)
+        if key in self.responses:
+            return 200, self.responses[key]
+        path = key.split("?")[0]
+        if path.startswith("/search/"):
+            return 200, {"page": 1, "results": [], "total_pages": 0, "total_results": 0}
+        appended = dict(params or {}).get("append_to_response")
+        if _SHOW_PATH.match(path) and appended:
+            response = dict(self.responses.get(path, {"id": int(path.rsplit("/", 1)[1])}))
+            for part in appended.split(","):
+                if f"{path}/{part}" in self.responses:
+                    response[part] = self.responses[f"{path}/{part}"]
+            return 200, response
+        episode_match = _EPISODE_PATH.match(path)
+        if episode_match and episode_match.group(1) in self.responses:
+            for episode in self.responses[episode_match.group(1)].get("episodes", []):
+                if episode.get("episode_number") == int(episode_match.group(2)):
+                    return 200, episode
+        return 404, {
+            "success": False,
+            "status_code": 34,
+            "status_message": "The resource you requested could not be found.",
+        }
+
+    @staticmethod
+    def _split(key: str) -> Tuple[str, Dict[str, str]]:
+        path, _, query = key.partition("?")
+        params = dict(part.split("=", 1) for part in query.split("&") if part)
+        return path, params
+
+
+class RecordedResponse:
+    """A minimal HTTP response, as used by `tmdbsimple`."""
+
+    def __init__(self, url: str, status_code: int, body: dict):
+        """
+        Initialize the response.
+
+        Arguments:
+            url: The requested URL.
+            status_code: The HTTP status code.
+            body: The JSON body.
+        """
+        self.url = url
+        self.status_code = status_code
+        self.body = body
+        self.encoding = "utf-8"
+        self.headers: Dict[str, str] = {}
+
+    def raise_for_status(self) -> None:
+        """
+        Raise an error if the status code is an error code.
+
+        Raises:
+            HTTPError: When the status code is 400 or more.
+        """
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def json(self) -> dict:
+        """
+        Return the JSON body.
+
+        Returns:
+            The body.
+        """
+        return self.body
+
+
+class RecordedSession:
+    """A `requests` session stand-in answering requests from a store, for `tmdbsimple`."""
+
+    def __init__(self, store: RecordedStore):
+        """
+        Initialize the session.
+
+        Arguments:
+            store: The recorded responses.
+        """
+        self.store = store
+        self.requests = 0
+
+    def request(self, method: str, url: str, params: Optional[Mapping[str, str]] = None, **kwargs) -> RecordedResponse:
+        """
+        Answer a request.
+
+        Arguments:
+            method: The HTTP method, only GET is supported.
+            url: The requested URL.
+            params: The query parameters.
+            **kwargs: Other `requests` arguments, ignored.
+
+        Returns:
+            The recorded response.
+        """
+        self.requests += 1
+        if method != "GET":
+            return RecordedResponse(url, 405, {"success": False, "status_message": "Method not allowed."})
+        return RecordedResponse(url, *self.store.get(urlsplit(url).path, params))
+
+
+class RateLimiter(TokenBucket):
+    """A token bucket rejecting requests beyond a given rate, in requests per second, like TMDB does."""
+
+    def acquire(self) -> float:
+        """
+        Try to let a request through.
+
+        Returns:
+            Zero if the request is allowed, otherwise the number of seconds to wait before retrying.
+        """
+        return self.take(1, borrow=False)
+
+
+class FixtureServer(ThreadingMixIn, HTTPServer):
+    """
+    A local stand-in for the TMDB API, replaying a store over HTTP.
+
+    Latency, errors and rate limiting are simulated, and requests are counted
+    in the `requests`, `errors` and `rate_limited` attributes.
+    """
+
+    daemon_threads = True
+
+    def __init__(  # noqa: WPS211 (too many arguments)
+        self,
+        store: RecordedStore,
+        port: int = 0,
+        address: str = "127.0.0.1",
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        rate_limit: Optional[RateLimiter] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the server.
+
+        Arguments:
+            store: The recorded responses.
+            port: The port to listen on (default: any free port).
+            address: The address to bind.
+            latency: Seconds to wait before answering each request.
+            jitter: Maximum number of seconds randomly added to the latency.
+            error_rate: Ratio of requests answered with a server error, between 0 and 1.
+            rate_limit: The limiter of requests, answered with a 429 error when over the limit.
+            seed: Seed of the random generator, for reproducible jitter and errors.
+        """
+        super().__init__((address, port), _FixtureHandler)
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    @property
+    def url(self) -> str:
+        """
+        Return the base URL to point the provider at.
+
+        Returns:
+            The base URL, including the API version.
+        """
+        address, port = self.server_address[:2]
+        return f"http://{address}:{port}/3"
+
+    def start(self) -> "FixtureServer":
+        """
+        Serve requests in a background thread.
+
+        Returns:
+            The server itself. Call its `shutdown` method to stop it.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def answer(self, path: str, params: Mapping[str, str]) -> Tuple[int, dict, Dict[str, str]]:
+        """
+        Answer a request, simulating latency, errors and rate limiting.
+
+        Arguments:
+            path: The request path.
+            params: The query parameters.
+
+        Returns:
+            An HTTP status code, a JSON body and additional headers.
+        """
+        with self.lock:
+            self.requests += 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            failing = self.random.random() < self.error_rate
+        retry_after = self.rate_limit.acquire() if self.rate_limit else 0
+        if retry_after:
+            with self.lock:
+                self.rate_limited += 1
+            body = {"success": False, "status_code": 25, "status_message": "Your request count is over the limit."}
+            return 429, body, {"Retry-After": str(math.ceil(retry_after))}
+        time.sleep(delay)
+        if failing:
+            with self.lock:
+                self.errors += 1
+            return 503, {"success": False, "status_code": 9, "status_message": "Service offline."}, {}
+        status, body = self.store.get(path, params)
+        return status, body, {}
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802 (imposed by the base class)
+        url = urlsplit(self.path)
+        status, body, headers = self.server.answer(url.path, dict(parse_qsl(url.query)))
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):  # noqa: WPS110 (imposed by the base class)
+        """Do not log requests."""
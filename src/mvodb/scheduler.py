@@ -0,0 +1,157 @@
+"""Module that contains the scheduler applying planned moves."""
+
+import errno
+import os
+import shutil
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from mvodb.estimate import PlannedMove
+from mvodb.metrics import BYTES_MOVED, STAGE_SECONDS
+from mvodb.throttle import TokenBucket
+
+COPY_SIZE = 1024 * 1024
+"""Number of bytes copied at once between devices."""
+
+
+class BandwidthLimiter(TokenBucket):
+    """A token bucket shared by copies, capping their total throughput, in bytes per second."""
+
+    def consume(self, size: int) -> None:
+        """
+        Wait until `size` bytes can be transferred.
+
+        Arguments:
+            size: The number of bytes about to be transferred.
+        """
+        delay = self.take(size)
+        if delay:
+            time.sleep(delay)
+
+
+def copy_file(source: str, destination: str, limiter: Optional[BandwidthLimiter] = None) -> None:
+    """
+    Copy a file then remove it, optionally capping the throughput.
+
+    Data is written to a temporary file next to the destination,
+    renamed once complete.
+
+    Arguments:
+        source: The file to move.
+        destination: Where to move it.
+        limiter: The bandwidth limiter to use.
+    """
+    partial = f"{destination}.part"
+    try:
+        with open(source, "rb") as reader, open(partial, "wb") as writer:
+            for block in iter(lambda: reader.read(COPY_SIZE), b""):
+                if limiter is not None:
+                    limiter.consume(len(block))
+                writer.write(block)
+        shutil.copystat(source, partial)
+        os.replace(partial, destination)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    os.remove(source)
+
+
+class MoveScheduler:
+    """
+    Apply moves concurrently, with a concurrency limit per (source device, destination device) pair.
+
+    Renames (same device) are done one after the other. Copies between two devices
+    are done by at most `limit` threads for this pair of devices, in source inode order
+    to limit seeking on spinning disks, and all copies share the optional bandwidth cap.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[Tuple[int, int], int]] = None,
+        default_limit: int = 1,
+        bandwidth: Optional[float] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Arguments:
+            limits: Number of concurrent copies for specific (source device, destination device) pairs.
+            default_limit: Number of concurrent copies for other pairs of devices.
+            bandwidth: Maximum total throughput of copies, in bytes per second.
+        """
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.limiter = BandwidthLimiter(bandwidth) if bandwidth else None
+
+    def _move(self, move: PlannedMove) -> None:
+        with STAGE_SECONDS.time(stage="move"):
+            if move.is_rename:
+                os.rename(move.source, move.destination)
+            else:
+                copy_file(move.source, move.destination, self.limiter)
+        BYTES_MOVED.inc(move.size, method="rename" if move.is_rename else "copy")
+
+    def run(self, moves: Iterable[PlannedMove]) -> List[Tuple[PlannedMove, Exception]]:
+        """
+        Apply moves.
+
+        Moves to an existing destination, or to the destination of a previous move,
+        are rejected before anything runs, with a `FileExistsError`.
+
+        Arguments:
+            moves: The moves to apply. Destination directories must exist.
+
+        Returns:
+            The moves that failed, with their error.
+        """
+        failures: List[Tuple[PlannedMove, Exception]] = []
+        groups: Dict[Tuple[int, int], List[PlannedMove]] = {}
+        for move, error in _check_destinations(moves):
+            if error is None:
+                groups.setdefault((move.source_device, move.destination_device), []).append(move)
+            else:
+                failures.append((move, error))
+
+        executors = []
+        futures: List[Tuple[PlannedMove, Future]] = []
+        for pair, group in groups.items():
+            if pair[0] == pair[1]:
+                continue
+            executor = ThreadPoolExecutor(max_workers=self.limits.get(pair, self.default_limit))
+            executors.append(executor)
+            futures.extend((move, executor.submit(self._move, move)) for move in sorted(group, key=_inode))
+
+        for pair, group in groups.items():
+            if pair[0] == pair[1]:
+                for move in group:
+                    try:
+                        self._move(move)
+                    except OSError as error:
+                        failures.append((move, error))
+
+        for move, future in futures:
+            error = future.exception()
+            if error is not None:
+                failures.append((move, error))
+        for executor in executors:
+            executor.shutdown()
+        return failures
+
+
+def _check_destinations(moves: Iterable[PlannedMove]) -> Iterator[Tuple[PlannedMove, Optional[Exception]]]:
+    destinations = set()
+    for move in moves:
+        source, destination = os.path.abspath(move.source), os.path.abspath(move.destination)
+        if destination in destinations:
+            yield move, FileExistsError(errno.EEXIST, "Destination of another move", str(move.destination))
+        elif destination != source and os.path.lexists(destination):
+            yield move, FileExistsError(errno.EEXIST, "Destination already exists", str(move.destination))
+        else:
+            destinations.add(destination)
+            yield move, None
+
+
+def _inode(move: PlannedMove) -> int:
+    return move.inode
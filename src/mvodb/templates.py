@@ -0,0 +1,175 @@
+"""Module that contains the path templates."""
+
+import string
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+MOVIE_TEMPLATE = "movies/{title} ({year})/{title} ({year}).{ext}"
+"""Default template for movies."""
+
+EPISODE_TEMPLATE = "series/{tvshow}/Season {season:02}/{tvshow} - S{season:02}E{episode:02} - {title}.{ext}"
+"""Default template for episodes."""
+
+SUBTITLE_TEMPLATE = "{lang}.{ext}"
+"""Default template for the extension of subtitles, when their language is known."""
+
+MOVIE_FIELDS = ("type", "title", "year", "ext")
+"""Fields available in movie templates."""
+
+EPISODE_FIELDS = ("type", "tvshow", "season", "episode", "title", "ext")
+"""Fields available in episode templates."""
+
+SUBTITLE_FIELDS = ("type", "title", "lang", "ext")
+"""Fields available in subtitle templates."""
+
+SANITIZE_TABLE = str.maketrans(
+    {
+        **{chr(code): None for code in range(32)},
+        "/": "-",
+        "\\": "-",
+        ":": " -",
+        "*": "",
+        "?": "",
+        '"': "'",
+        "<": "",
+        ">": "",
+        "|": "-",
+    }
+)
+"""Translation table replacing characters that are illegal in file names."""
+
+
+def sanitize(value: Any) -> Any:
+    """
+    Remove or replace characters that are illegal in file names.
+
+    Leading dots are removed too, so that values cannot point to parent directories or hidden files.
+
+    Arguments:
+        value: A value to render in a path. Only strings are sanitized.
+
+    Returns:
+        The sanitized value.
+    """
+    if isinstance(value, str):
+        sanitized = value.translate(SANITIZE_TABLE).strip().lstrip(".").lstrip()
+        return sanitized or ("_" if value else value)
+    return value
+
+
+class Template:
+    """A path template, parsed and compiled once."""
+
+    def __init__(self, template: str):
+        """
+        Initialize the template.
+
+        Fields use the [format string syntax](https://docs.python.org/3/library/string.html#formatstrings),
+        for example `{season:02}`. Field values are sanitized, literal text is not.
+
+        Arguments:
+            template: The template string.
+
+        Raises:
+            ValueError: When the template is invalid or uses positional, indexed or attribute fields.
+        """
+        self.template = template
+        fields: List[str] = []
+        parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is None:
+                continue
+            if not field.isidentifier():
+                raise ValueError(f"Template '{template}' must only use plain named fields, not '{{{field}}}'")
+            if field not in fields:
+                fields.append(field)
+            conversion = f"!{conversion}" if conversion else ""
+            spec = f":{spec}" if spec else ""
+            parts.append(f"{{{fields.index(field)}{conversion}{spec}}}")
+        self.fields = tuple(fields)
+        self._format = "".join(parts).format
+
+    def __call__(self, data: Dict[str, Any]) -> str:
+        """
+        Render the template.
+
+        Arguments:
+            data: The field values.
+
+        Returns:
+            The rendered string.
+        """
+        return self._format(*[sanitize(data[field]) for field in self.fields])
+
+
+def _checked(template: Template, kind: str, known: Tuple[str, ...]) -> Template:
+    for field in template.fields:
+        if field not in known:
+            raise ValueError(
+                f"Unknown field '{{{field}}}' in {kind} template '{template.template}', "
+                f"available fields: {', '.join(known)}"
+            )
+    return template
+
+
+class PathTemplates:
+    """The set of templates used to compute destination paths."""
+
+    def __init__(
+        self,
+        root: Union[str, Path] = ".",
+        movie: str = MOVIE_TEMPLATE,
+        episode: str = EPISODE_TEMPLATE,
+        subtitle: str = SUBTITLE_TEMPLATE,
+    ):
+        """
+        Initialize the templates.
+
+        Arguments:
+            root: The directory in which paths are rendered.
+            movie: The template for movies.
+            episode: The template for episodes.
+            subtitle: The template for the extension of subtitles with a known language.
+
+        Raises:
+            ValueError: When a template is invalid or uses unknown fields.
+        """
+        self.root = Path(root)
+        self.movie = _checked(Template(movie), "movie", MOVIE_FIELDS)
+        self.episode = _checked(Template(episode), "episode", EPISODE_FIELDS)
+        self.subtitle = _checked(Template(subtitle), "subtitle", SUBTITLE_FIELDS)
+        self._templates = {"movie": self.movie, "episode": self.episode}
+
+    def relative(self, match: Dict[str, Any]) -> str:
+        """
+        Render the path of a match, relative to the root.
+
+        Arguments:
+            match: The match metadata, with its type and extension.
+
+        Raises:
+            ValueError: When the type of the match is neither movie nor episode.
+
+        Returns:
+            The relative path.
+        """
+        try:
+            template = self._templates[match["type"]]
+        except KeyError:
+            raise ValueError(f"Cannot render a path for type '{match['type']}'")
+        if match.get("lang"):
+            match = dict(match, ext=self.subtitle(match))
+        return template(match)
+
+    def render(self, match: Dict[str, Any]) -> str:
+        """
+        Render the path of a match.
+
+        Arguments:
+            match: The match metadata, with its type and extension.
+
+        Returns:
+            The path, prefixed with the root.
+        """
+        return str(self.root / self.relative(match))
@@ -0,0 +1,44 @@
+"""Module that contains the token bucket throttling copies and simulated requests."""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """A thread-safe token bucket, refilled at a constant rate up to its capacity."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Initialize the bucket, full.
+
+        Arguments:
+            rate: Number of tokens added per second.
+            burst: Capacity of the bucket (default: one second worth of tokens).
+        """
+        self.rate = rate
+        self.burst = burst or rate
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, count: float, borrow: bool = True) -> float:
+        """
+        Take tokens from the bucket.
+
+        Arguments:
+            count: The number of tokens to take.
+            borrow: Whether to take missing tokens in advance, the caller then waiting before proceeding.
+                Otherwise, nothing is taken when tokens are missing.
+
+        Returns:
+            Zero if the tokens are available now, otherwise the number of seconds to wait for them.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            missing = count - self.tokens
+            if borrow or missing <= 0:
+                self.tokens -= count
+            return max(missing, 0) / self.rate
@@ -1 +1,44 @@
 """Configuration for the pytest test suite."""
+
+import pytest
+
+
+def pytest_addoption(parser):
+    """
+    Add command line options.
+
+    Arguments:
+        parser: The pytest options parser.
+    """
+    parser.addoption(
+        "--full-corpus",
+        action="store_true",
+        default=False,
+        help="Also check the whole regression corpus, not only a sample (about a minute).",
+    )
+
+
+def pytest_configure(config):
+    """
+    Register the markers.
+
+    Arguments:
+        config: The pytest configuration.
+    """
+    config.addinivalue_line("markers", "full_corpus: regression tests on the whole corpus, run with --full-corpus")
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Skip the tests on the whole corpus unless asked to run them.
+
+    Arguments:
+        config: The pytest configuration.
+        items: The collected tests.
+    """
+    if config.getoption("--full-corpus"):
+        return
+    skip = pytest.mark.skip(reason="run with --full-corpus")
+    for item in items:
+        if "full_corpus" in item.keywords:
+            item.add_marker(skip)
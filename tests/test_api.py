@@ -0,0 +1,143 @@
+"""Tests for the `api` module."""
+
+from mvodb.api import apply, parse_many, plan, resolve_many, scan
+from mvodb.catalog import Catalog
+from mvodb.fingerprint import HashIndex
+from mvodb.metrics import STAGE_SECONDS
+from mvodb.templates import PathTemplates
+
+
+class FakeProvider:
+    """A fake provider answering lookups locally and counting them."""
+
+    def __init__(self):
+        self.lookups = 0
+
+    def search_tv(self, title):
+        return [{"id": 1, "name": title}]
+
+    def prefetch_seasons(self, show_id, season_numbers):
+        pass
+
+    def get_episode_matches(self, title, season_number, episode_number):
+        self.lookups += 1
+        if title == "Broken Show":
+            raise RuntimeError("lookup failed")
+        return [{"tvshow": title, "season": season_number, "episode": episode_number, "title": "Pilot"}]
+
+    def get_movie_matches(self, title):
+        self.lookups += 1
+        if title.startswith("Totally Unknown"):
+            return []
+        return [{"title": title, "year": "2010"}]
+
+
+def test_pipeline(tmp_path):
+    """
+    Files are scanned, parsed, resolved, planned, moved and recorded.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    (downloads / "Inception.2010.mkv").write_bytes(b"movie")
+    (downloads / "The.Wire.S01E01.mkv").write_bytes(b"episode")
+    (downloads / "notes.txt").write_text("ignored")
+    templates = PathTemplates(tmp_path / "library")
+    provider = FakeProvider()
+    catalog = Catalog(tmp_path / "catalog.db")
+
+    before = STAGE_SECONDS.snapshot()
+    files = sorted(scan([downloads]))
+    assert [file.name for file in files] == ["Inception.2010.mkv", "The.Wire.S01E01.mkv"]
+    moves = list(plan(resolve_many(parse_many(files), provider), templates))
+    results = apply(moves, catalog=catalog)
+
+    assert [error for _, error in results] == [None, None]
+    assert (tmp_path / "library" / "movies" / "Inception (2010)" / "Inception (2010).mkv").read_bytes() == b"movie"
+    assert len(catalog) == 2
+    assert provider.lookups == 2
+    after = STAGE_SECONDS.snapshot()
+    for stage in ("guess", "fetch", "move"):
+        assert after[stage]["count"] - before.get(stage, {"count": 0})["count"] == 2
+
+
+def test_resolve_from_hash_index(tmp_path):
+    """
+    Files already seen are resolved from the hash index, without online lookups.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    source = tmp_path / "Inception.2010.mkv"
+    source.write_bytes(b"movie")
+    index = HashIndex(tmp_path / "hashes.db")
+    provider = FakeProvider()
+
+    moves = list(plan(resolve_many(parse_many([source]), provider, index), PathTemplates(tmp_path / "library")))
+    apply(moves, index=index)
+    assert provider.lookups == 1
+
+    source.write_bytes(b"movie")
+    guesses = list(resolve_many(parse_many([source]), provider, index))
+    assert provider.lookups == 1
+    assert guesses[0].get_match()["title"] == "Inception"
+
+
+def test_plan_skips_guesses_without_match(tmp_path):
+    """
+    Files without match are skipped, and their guess records why.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    files = [tmp_path / "Totally.Unknown.Film.1999.mkv", tmp_path / "Inception.2010.mkv"]
+    for file in files:
+        file.write_bytes(b"")
+    guesses = list(resolve_many(parse_many(files), FakeProvider()))
+    moves = list(plan(guesses, PathTemplates(tmp_path / "library")))
+    assert [move.source for move in moves] == [str(files[1])]
+    assert isinstance(guesses[0].error, LookupError)
+    assert guesses[1].error is None
+
+
+def test_resolve_isolates_errors():
+    """A failed lookup is recorded in its guess, without stopping the others."""
+    names = ["Broken.Show.S01E01.mkv", "[HorribleSubs] One Piece - 1000 [1080p].mkv", "The.Wire.S01E01.mkv"]
+    guesses = list(resolve_many(parse_many(names), FakeProvider()))
+    assert isinstance(guesses[0].error, RuntimeError)
+    assert isinstance(guesses[1].error, KeyError)
+    assert guesses[2].error is None
+    assert guesses[2].get_match()["tvshow"] == "The Wire"
+
+
+def test_scan_yields_each_file_once(tmp_path):
+    """
+    A file given directly and through its directory is scanned once.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    source = tmp_path / "The.Wire.S01E01.mkv"
+    source.write_bytes(b"episode")
+    assert list(scan([tmp_path, source])) == [source]
+
+
+def test_apply_reports_errors_per_move(tmp_path):
+    """
+    Moves with the same source are told apart: only the rejected one fails.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    source = tmp_path / "The.Wire.S01E01.mkv"
+    source.write_bytes(b"episode")
+    catalog = Catalog(tmp_path / "catalog.db")
+    moves = list(plan(resolve_many(parse_many([source, source]), FakeProvider()), PathTemplates(tmp_path / "library")))
+
+    results = apply(moves, catalog=catalog)
+
+    assert results[0][1] is None
+    assert isinstance(results[1][1], FileExistsError)
+    assert [path for path, _ in catalog.items()] == [moves[0].destination]
@@ -0,0 +1,83 @@
+"""Tests for the `cache` module."""
+
+import threading
+
+import pytest
+
+from mvodb.cache import MISSING, LRUCache, Memo
+
+
+def test_lru_eviction_and_stats():
+    """The least recently used entry is evicted, and statistics are kept."""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("c") == 3
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (2, 1, 1)
+    assert cache.stats.hit_rate == pytest.approx(2 / 3)
+
+
+def _concurrent_calls(function, args, count=8):
+    barrier = threading.Barrier(count)
+    results = []
+
+    def call():  # noqa: WPS430 (nested function)
+        barrier.wait()
+        try:
+            results.append(function(*args))
+        except ValueError as error:
+            results.append(error)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_are_coalesced():
+    """Identical concurrent calls share a single call and its result."""
+    calls = []
+    release = threading.Event()
+    memo = Memo()
+
+    def upper(title):  # noqa: WPS430 (nested function)
+        calls.append(title)
+        release.wait(1)
+        return title.upper()
+
+    def lookup(title):  # noqa: WPS430 (nested function)
+        return memo.get(title, lambda: upper(title))
+
+    threading.Timer(0.1, release.set).start()
+    assert _concurrent_calls(lookup, ["wire"]) == ["WIRE"] * 8
+    assert calls == ["wire"]
+    assert memo.flight.coalesced + memo.cache.stats.hits == 7
+
+
+def test_errors_are_shared_but_not_cached():
+    """Waiting calls get the error of the shared call, and the next call retries."""
+    calls = []
+    release = threading.Event()
+    memo = Memo()
+
+    def fail_once(title):  # noqa: WPS430 (nested function)
+        calls.append(title)
+        release.wait(1)
+        if len(calls) == 1:
+            raise ValueError(title)
+        return title
+
+    def lookup(title):  # noqa: WPS430 (nested function)
+        return memo.get(title, lambda: fail_once(title))
+
+    threading.Timer(0.1, release.set).start()
+    results = _concurrent_calls(lookup, ["wire"])
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert lookup("wire") == "wire"
+    assert len(calls) == 2
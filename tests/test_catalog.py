@@ -0,0 +1,32 @@
+"""Tests for the `catalog` module."""
+
+from mvodb.catalog import Catalog
+
+
+def test_add_and_record_items(tmp_path):
+    """
+    Items are added, listed and recorded again after a move.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    catalog = Catalog(tmp_path / "catalog.db")
+    catalog.add("/library/a.mkv", {"type": "movie", "title": "A", "year": "2000", "ext": "mkv"})
+    catalog.add("/library/b.mkv", {"type": "movie", "title": "B", "year": "2001", "ext": "mkv"})
+    catalog.record([("/library/a.mkv", "/library/A (2000).mkv", {"type": "movie", "title": "A", "year": "2000"})])
+    assert len(catalog) == 2
+    assert [path for path, _ in catalog.items()] == ["/library/A (2000).mkv", "/library/b.mkv"]
+
+
+def test_root_is_recorded(tmp_path):
+    """
+    The library directory is kept across sessions.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    catalog = Catalog(tmp_path / "catalog.db")
+    assert catalog.root is None
+    catalog.root = tmp_path / "library"
+    catalog.close()
+    assert Catalog(tmp_path / "catalog.db").root == str(tmp_path / "library")
@@ -1,8 +1,12 @@
 """Tests for the `cli` module."""
 
+import os
+
 import pytest
 
 from mvodb import cli
+from mvodb.catalog import Catalog
+from mvodb.fingerprint import HashIndex, opensubtitles_hash
 
 
 def test_main():
@@ -21,3 +25,116 @@ def test_show_help(capsys):
         cli.main(["-h"])
     captured = capsys.readouterr()
     assert "mvodb" in captured.out
+
+
+def test_retemplate(tmp_path):
+    """
+    Move cataloged items to their new paths without guessing or fetching anything.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    library = tmp_path / "library"
+    old_path = library / "movies" / "Inception (2010)" / "Inception (2010).mkv"
+    old_path.parent.mkdir(parents=True)
+    old_path.write_text("")
+    catalog = Catalog(tmp_path / "catalog.db")
+    catalog.add(str(old_path), {"type": "movie", "title": "Inception", "year": "2010", "ext": "mkv"})
+    catalog.close()
+
+    args = ["-y", "--catalog", str(tmp_path / "catalog.db"), "--root", str(library)]
+    assert cli.main(["retemplate", *args, "--movie-template", "films/{title}.{ext}"]) == 0
+
+    new_path = library / "films" / "Inception.mkv"
+    assert new_path.exists()
+    assert not (library / "movies").exists()
+    assert [path for path, _ in Catalog(tmp_path / "catalog.db").items()] == [str(new_path)]
+
+
+def _resolve_offline(guesses, *args, **kwargs):
+    for guess in guesses:
+        guess.data["matches"] = [{"title": guess.data["title"], "year": str(guess.data["year"])}]
+        yield guess
+
+
+def test_retemplate_defaults_to_the_recorded_root(tmp_path, capsys, monkeypatch):
+    """
+    Items are moved within the library they were imported in, and never out of the given library.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+        capsys: Pytest fixture to capture output.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    monkeypatch.setattr(cli, "resolve_many", _resolve_offline)
+    library = tmp_path / "library"
+    source = tmp_path / "Inception.2010.mkv"
+    source.write_bytes(b"movie")
+    catalog = tmp_path / "catalog.db"
+    args = ["-y", "--no-index", "--catalog", str(catalog)]
+    assert cli.main([*args, "--root", str(library), str(source)]) == 0
+    assert Catalog(catalog).root == str(library)
+
+    args = ["retemplate", "-y", "--catalog", str(catalog)]
+    with pytest.raises(SystemExit):
+        cli.main([*args, "--root", str(tmp_path / "other"), "--movie-template", "films/{title}.{ext}"])
+    assert "1 cataloged items" in capsys.readouterr().err
+    assert cli.main([*args, "--movie-template", "films/{title}.{ext}"]) == 0
+    assert (library / "films" / "Inception.mkv").read_bytes() == b"movie"
+
+
+def test_check_library_uses_catalog(tmp_path, capsys):
+    """
+    Files already organized are found through the catalog, without walking the library.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+        capsys: Pytest fixture to capture output.
+    """
+    organized = tmp_path / "library" / "movies" / "Inception (2010)" / "Inception (2010).mkv"
+    organized.parent.mkdir(parents=True)
+    organized.write_bytes(b"movie")
+    source = tmp_path / "Inception.2010.mkv"
+    source.write_bytes(b"movie")
+    catalog = Catalog(tmp_path / "catalog.db")
+    catalog.add(str(organized), {"type": "movie", "title": "Inception", "year": "2010", "ext": "mkv"})
+    catalog.close()
+
+    args = ["-n", "--no-index", "--duplicates", "skip", "--catalog", str(tmp_path / "catalog.db")]
+    assert cli.main([*args, "--check-library", "--root", str(tmp_path / "library"), str(source)]) == 0
+    assert f"'{source}' is a duplicate of '{organized}', skipping" in capsys.readouterr().err
+
+
+class OfflineProvider:
+    """A provider finding nothing, without network access."""
+
+    def get_movie_matches(self, title):
+        return []
+
+
+def test_dry_run_does_not_write(tmp_path, capsys, monkeypatch):
+    """
+    A dry run creates nothing, and only reads an existing hash index.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+        capsys: Pytest fixture to capture output.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    monkeypatch.setattr(cli, "_get_provider", lambda args: OfflineProvider())
+    source = tmp_path / "Inception.2010.mkv"
+    source.write_bytes(b"movie")
+    data = tmp_path / "data"
+    args = ["-n", "--check-library", "--catalog", str(data / "catalog.db"), "--index", str(data / "hashes.db")]
+    args.extend(["--root", str(tmp_path / "library"), str(source)])
+
+    assert cli.main(args) == 1
+    assert not data.exists()
+
+    index = HashIndex(data / "hashes.db")
+    index.add(opensubtitles_hash(source), {"type": "movie", "title": "Inception", "year": "2010"})
+    index.close()
+    assert cli.main(args) == 0
+    assert os.path.join("movies", "Inception (2010)", "Inception (2010).mkv") in capsys.readouterr().out
+    assert sorted(path.name for path in data.iterdir()) == ["hashes.db"]
+    assert source.exists()
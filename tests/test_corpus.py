@@ -0,0 +1,132 @@
+"""Regression tests for release names classification, on the corpus of `tests/fixtures`."""
+
+import json
+from pathlib import Path
+
+import guessit
+import pytest
+
+from mvodb.corpus import Report, evaluate_parse, evaluate_pipeline, load_corpus, normalize_title
+from mvodb.provider import TMDBProvider
+from mvodb.recorded import RecordedSession, RecordedStore
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+SAMPLE_STRIDE = 40
+"""By default, only one name out of forty is processed, to keep the suite fast. Use `--full-corpus` for the rest.
+
+It must be a multiple of `RECORDED_STRIDE`, so that the sample has recorded responses.
+"""
+
+CHUNKS = 8
+"""Number of tests the whole corpus is split into, so that they can run in parallel."""
+
+RECORDED_STRIDE = 10
+"""Responses are recorded for one name out of ten, see `scripts/gen_corpus.py`."""
+
+SPEED_TOLERANCE = 0.5
+"""Maximum slowdown compared to the recorded speed, as a ratio, leaving room for timing noise on small samples."""
+
+with open(FIXTURES / "corpus_failures.json") as stream:
+    EXPECTED_FAILURES = json.load(stream)
+"""Names known to be misclassified per stage, and parsing speed, as recorded by
+`scripts/benchmark_corpus.py --update-failures`: re-record them on the machine running the tests."""
+
+recorded_guessit = pytest.mark.skipif(
+    EXPECTED_FAILURES["guessit"] != guessit.__version__,
+    reason=f"expected failures were recorded with guessit {EXPECTED_FAILURES['guessit']}, "
+    f"run 'scripts/benchmark_corpus.py --update-failures' to record them with guessit {guessit.__version__}",
+)
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """
+    Return the corpus entries.
+
+    Returns:
+        The corpus entries.
+    """
+    return load_corpus(FIXTURES / "corpus.jsonl")
+
+
+def _check(report: Report, entries: list, stage: str) -> None:
+    expected = EXPECTED_FAILURES[stage]
+    names = {entry["name"] for entry in entries}
+    regressions = {name: failure for name, failure in report.failures.items() if name not in expected}
+    fixed = sorted(name for name in names.intersection(expected) if name not in report.failures)
+    assert not regressions, "\n".join(f"{name}: {failure}" for name, failure in regressions.items())
+    assert not fixed, "Now classified correctly, remove from the expected failures:\n" + "\n".join(fixed)
+
+
+def test_corpus_shapes(corpus):
+    """
+    The corpus is large and covers the shapes where classification goes wrong.
+
+    Arguments:
+        corpus: The corpus entries.
+    """
+    assert len(corpus) >= 4000
+    assert any(isinstance(entry.get("episode"), list) for entry in corpus)
+    assert any("date" in entry for entry in corpus)
+    assert any(entry["type"] == "episode" and "season" not in entry and "date" not in entry for entry in corpus)
+
+
+def test_normalize_title():
+    """Case, punctuation and lists of titles are normalized."""
+    assert normalize_title("Pan's Labyrinth") == normalize_title("pans labyrinth")
+    assert normalize_title(["Mad Max", "Fury Road"]) == "mad max fury road"
+
+
+@recorded_guessit
+def test_parse_accuracy_and_speed(corpus, record_property):
+    """
+    Names of a sample are classified as before, and as fast.
+
+    Arguments:
+        corpus: The corpus entries.
+        record_property: Pytest fixture to add properties to the test report.
+    """
+    entries = corpus[::SAMPLE_STRIDE]
+    report = evaluate_parse(entries)
+    record_property("summary", report.summary())
+    _check(report, entries, "parse")
+    baseline = EXPECTED_FAILURES["names_per_second"]
+    assert report.names_per_second >= baseline * (1 - SPEED_TOLERANCE), f"recorded speed: {baseline} names/sec"
+
+
+@recorded_guessit
+@pytest.mark.full_corpus
+@pytest.mark.parametrize("chunk", range(CHUNKS))
+def test_full_corpus_parse_accuracy(corpus, chunk):
+    """
+    All names are classified as before.
+
+    Arguments:
+        corpus: The corpus entries.
+        chunk: The index of the corpus chunk to parse.
+    """
+    entries = corpus[chunk::CHUNKS]
+    _check(evaluate_parse(entries), entries, "parse")
+
+
+@recorded_guessit
+@pytest.mark.parametrize("stride", [SAMPLE_STRIDE, pytest.param(RECORDED_STRIDE, marks=pytest.mark.full_corpus)])
+def test_pipeline_accuracy(corpus, stride, monkeypatch, record_property):
+    """
+    Names are resolved as before against recorded TMDB responses.
+
+    Arguments:
+        corpus: The corpus entries.
+        stride: Only one name out of `stride` is resolved.
+        monkeypatch: Pytest fixture to patch objects.
+        record_property: Pytest fixture to add properties to the test report.
+    """
+    monkeypatch.setattr("tmdbsimple.API_KEY", "recorded")
+    session = RecordedSession(RecordedStore.load(FIXTURES / "tmdb.json"))
+    entries = corpus[::stride]
+    report = evaluate_pipeline(entries, TMDBProvider(session=session))
+    record_property("summary", report.summary())
+    _check(report, entries, "pipeline")
+    titles = {(entry["type"], entry["title"]) for entry in entries}
+    assert session.requests < 2 * len(titles)  # a search per title, and seasons loaded in bulk
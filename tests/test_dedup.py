@@ -0,0 +1,72 @@
+"""Tests for the `dedup` module."""
+
+import os
+from pathlib import Path
+
+from mvodb.dedup import find_duplicates, iter_files
+from mvodb.fingerprint import CHUNK_SIZE
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_find_duplicates_in_sources_and_library(tmp_path):
+    """
+    Copies are reported against the library first, then the first source.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    content = b"a" * CHUNK_SIZE * 3
+    library = _write(tmp_path / "library" / "movie.mkv", content)
+    first = _write(tmp_path / "downloads" / "movie.mkv", content)
+    second = _write(tmp_path / "downloads" / "movie.copy.mkv", content)
+    other = _write(tmp_path / "downloads" / "other.mkv", b"b" * CHUNK_SIZE * 3)
+    duplicates = find_duplicates([first, second, other], list(iter_files(tmp_path / "library", ["mkv"])))
+    assert duplicates == {first: library, second: library}
+    assert find_duplicates([first, second, other]) == {second: first}
+
+
+def test_same_head_and_tail_but_different_middle(tmp_path):
+    """
+    Files only differing in the middle are not duplicates.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    first = _write(tmp_path / "a.mkv", b"a" * CHUNK_SIZE * 3)
+    second = _write(tmp_path / "b.mkv", b"a" * CHUNK_SIZE + b"b" * CHUNK_SIZE + b"a" * CHUNK_SIZE)
+    assert find_duplicates([first, second]) == {}
+
+
+def test_read_budget(tmp_path):
+    """
+    Candidates are not reported when hashing them would exceed the read budget.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    first = _write(tmp_path / "a.mkv", b"a" * CHUNK_SIZE * 3)
+    second = _write(tmp_path / "b.mkv", b"a" * CHUNK_SIZE * 3)
+    assert find_duplicates([first, second], read_budget=CHUNK_SIZE) == {}
+    assert find_duplicates([first, second], read_budget=CHUNK_SIZE * 6) == {second: first}
+
+
+def test_same_file_is_not_a_duplicate(tmp_path, monkeypatch):
+    """
+    A file given with another path, or hard linked, is not a duplicate of itself.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    library = _write(tmp_path / "library" / "movie.mkv", b"a" * CHUNK_SIZE * 3)
+    link = tmp_path / "downloads" / "movie.mkv"
+    link.parent.mkdir()
+    os.link(library, link)
+    monkeypatch.chdir(tmp_path)
+    relative = Path("library") / "movie.mkv"
+    assert find_duplicates([relative, link], list(iter_files(tmp_path / "library", ["mkv"]))) == {}
@@ -0,0 +1,60 @@
+"""Tests for the `estimate` module."""
+
+from mvodb.estimate import Estimate, PlannedMove, existing_ancestor
+
+
+def test_existing_ancestor(tmp_path):
+    """
+    The nearest existing parent is returned.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    assert existing_ancestor(tmp_path / "a" / "b" / "c.mkv") == tmp_path
+
+
+def test_estimate_copies_per_device(tmp_path):
+    """
+    Renames cost nothing, copies are summed and timed per destination device.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    source = tmp_path / "movie.mkv"
+    source.write_bytes(b"0" * 1000)
+    rename = PlannedMove(source, tmp_path / "movies" / "movie.mkv")
+    copy = PlannedMove(source, tmp_path / "movies" / "copy.mkv")
+    copy.destination_device = rename.destination_device + 1
+    assert rename.is_rename
+    assert not copy.is_rename
+
+    estimate = Estimate([rename, copy, copy], {copy.destination_device: 100}, default_throughput=1)
+    assert (estimate.renames, estimate.copies) == (1, 2)
+    assert estimate.bytes_to_copy == {copy.destination_device: 2000}
+    assert estimate.total_seconds == 20
+    assert estimate.report() == [
+        "3 moves: 1 renames, 2 copies",
+        f"device {copy.destination_device}: 2.0 KB to copy, about 20s",
+        "estimated duration: 20s",
+    ]
+
+
+def test_estimate_concurrent_devices_and_bandwidth(tmp_path):
+    """
+    Copies to different devices overlap, within the bandwidth cap.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    source = tmp_path / "movie.mkv"
+    source.write_bytes(b"0" * 1000)
+    first = PlannedMove(source, tmp_path / "first.mkv")
+    first.destination_device += 1
+    second = PlannedMove(source, tmp_path / "second.mkv")
+    second.destination_device += 2
+
+    assert Estimate([first, second], default_throughput=100).total_seconds == 10
+    estimate = Estimate([first, second], default_throughput=100, bandwidth=50)
+    assert estimate.seconds == {first.destination_device: 20, second.destination_device: 20}
+    assert estimate.total_seconds == 40
+    assert Estimate([first, second], default_throughput=100, bandwidth=150).total_seconds == 2000 / 150
@@ -0,0 +1,49 @@
+"""Tests for the `fingerprint` module."""
+
+import struct
+
+from mvodb.fingerprint import CHUNK_SIZE, HashIndex, opensubtitles_hash
+
+
+def test_hash_only_reads_head_and_tail(tmp_path):
+    """
+    Only the first and last 64 KiB are summed with the file size.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    size = CHUNK_SIZE * 4
+    content = bytearray(size)
+    content[:8] = struct.pack("<Q", 1)
+    content[CHUNK_SIZE * 2 : CHUNK_SIZE * 2 + 8] = struct.pack("<Q", 1000)
+    content[-8:] = struct.pack("<Q", 2)
+    path = tmp_path / "movie.mkv"
+    path.write_bytes(bytes(content))
+    assert opensubtitles_hash(path) == f"{size + 3:016x}"
+
+
+def test_hash_wraps_around_64_bits(tmp_path):
+    """
+    The sum is truncated to 64 bits.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    path = tmp_path / "movie.mkv"
+    path.write_bytes(b"\xff" * CHUNK_SIZE * 2)
+    assert len(opensubtitles_hash(path)) == 16
+
+
+def test_index_roundtrip(tmp_path):
+    """
+    Recorded metadata is found again by hash, even after reopening the index.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    metadata = {"type": "movie", "title": "Inception", "year": "2010"}
+    index = HashIndex(tmp_path / "sub" / "hashes.db")
+    assert index.get("0123456789abcdef") is None
+    index.add("0123456789abcdef", metadata)
+    index.close()
+    assert HashIndex(tmp_path / "sub" / "hashes.db").get("0123456789abcdef") == metadata
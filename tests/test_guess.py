@@ -0,0 +1,42 @@
+"""Tests for the `guess` module."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langdetect import detector_factory
+
+from mvodb.guess import Guess
+
+
+def test_get_match():
+    """The best match is completed with the type and extension of the file."""
+    guess = Guess("Inception.2010.mkv")
+    guess.data["matches"] = [{"title": "Inception", "year": "2010"}]
+    assert guess.get_match() == {"title": "Inception", "year": "2010", "type": "movie", "ext": "mkv"}
+
+
+def test_get_match_without_matches():
+    """A clear error is raised when nothing matched."""
+    guess = Guess("Totally.Unknown.Film.1999.mkv")
+    guess.data["matches"] = []
+    with pytest.raises(LookupError, match="no match found"):
+        guess.get_match()
+
+
+def test_concurrent_language_detection(tmp_path, monkeypatch):
+    """
+    Languages are detected from threads, even before langdetect is loaded.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    monkeypatch.setattr(detector_factory, "_factory", None)
+    guesses = []
+    for episode in range(1, 9):
+        subtitle = tmp_path / f"The.Wire.S01E0{episode}.srt"
+        subtitle.write_text("1\n00:00:01,000 --> 00:00:02,000\nWhere are you going? I have no idea, man.\n")
+        guesses.append(Guess(str(subtitle)))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(Guess.detect_language, guesses))
+    assert [guess.data.get("lang") for guess in guesses] == ["en"] * 8
@@ -0,0 +1,58 @@
+"""Tests for the `metrics` module."""
+
+import io
+import json
+from urllib.request import urlopen
+
+from mvodb.metrics import Registry, Reporter, serve
+
+
+def _registry():
+    registry = Registry()
+    counter = registry.counter("test_requests_total", "Requests.", ["endpoint"])
+    counter.inc(endpoint="search/tv")
+    counter.inc(2, endpoint='say "hi"')
+    histogram = registry.histogram("test_seconds", "Durations.", buckets=(0.1, 1, float("inf")))
+    histogram.observe(0.5)
+    histogram.observe(2)
+    return registry
+
+
+def test_render_prometheus_text():
+    """Counters and histograms are rendered in the Prometheus text format."""
+    lines = _registry().render().splitlines()
+    assert "# TYPE test_requests_total counter" in lines
+    assert 'test_requests_total{endpoint="search/tv"} 1' in lines
+    assert 'test_requests_total{endpoint="say \\"hi\\""} 2' in lines
+    assert 'test_seconds_bucket{le="0.1"} 0' in lines
+    assert 'test_seconds_bucket{le="1.0"} 1' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 2' in lines
+    assert "test_seconds_sum 2.5" in lines
+    assert "test_seconds_count 2" in lines
+
+
+def test_reporter_writes_json_lines_and_textfile(tmp_path):
+    """
+    The final report is written as a JSON line and as a text file.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    registry = _registry()
+    stream = io.StringIO()
+    Reporter(stream=stream, textfile=tmp_path / "mvodb.prom", registry=registry).stop()
+    line = json.loads(stream.getvalue())
+    assert line["test_requests_total"] == {"search/tv": 1, 'say "hi"': 2}
+    assert line["test_seconds"] == {"": {"count": 2, "sum": 2.5}}
+    assert (tmp_path / "mvodb.prom").read_text() == registry.render()
+
+
+def test_serve_over_http():
+    """Metrics are served over HTTP."""
+    registry = _registry()
+    server = serve(0, registry=registry)
+    try:
+        with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:  # noqa: S310
+            assert response.read().decode() == registry.render()
+    finally:
+        server.shutdown()
@@ -0,0 +1,19 @@
+"""Tests for the `paths` module."""
+
+from pathlib import Path
+
+from mvodb.paths import data_path
+
+
+def test_data_path(monkeypatch, tmp_path):
+    """
+    Data files are stored in the XDG data directory, or in the home directory.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    assert data_path("catalog.db") == tmp_path / "mvodb" / "catalog.db"
+    monkeypatch.delenv("XDG_DATA_HOME")
+    assert data_path("catalog.db") == Path.home() / ".local" / "share" / "mvodb" / "catalog.db"
@@ -0,0 +1,123 @@
+"""Tests for the `prefetch` module."""
+
+import pytest
+
+from mvodb import provider
+from mvodb.api import parse_many, resolve_many
+from mvodb.guess import Guess
+from mvodb.prefetch import plan_prefetch, prefetch
+
+
+class FakeTV:
+    """A fake `tmdbsimple.TV` class recording the requests it receives."""
+
+    requests = []
+
+    def __init__(self, show_id):
+        self.show_id = show_id
+
+    def info(self, append_to_response=""):
+        self.requests.append((self.show_id, append_to_response))
+        response = {"id": self.show_id}
+        for part in append_to_response.split(","):
+            number = int(part.split("/")[1])
+            response[part] = {"episodes": [{"episode_number": 1, "name": f"Episode {number}x1"}]}
+        return response
+
+
+@pytest.fixture(autouse=True)
+def _fake_tmdb(monkeypatch):
+    monkeypatch.setattr(provider.tmdb, "TV", FakeTV)
+    monkeypatch.setattr(FakeTV, "requests", [])
+
+
+@pytest.fixture()
+def tmdb_provider(monkeypatch):
+    """Return a provider whose show searches return a single show named after the title."""
+    instance = provider.TMDBProvider()
+    monkeypatch.setattr(instance, "_search_tv", lambda title: [{"id": 1, "name": title}])
+    return instance
+
+
+def test_plan_groups_seasons_by_show():
+    """Seasons are grouped by show title, movies are ignored."""
+    guesses = [
+        Guess(name)
+        for name in (
+            "The.Wire.S01E01.mkv",
+            "The.Wire.S01E02.mkv",
+            "The.Wire.S03E01.mkv",
+            "Friends.S02E05.mkv",
+            "Inception.2010.mkv",
+        )
+    ]
+    assert plan_prefetch(guesses) == {"The Wire": {1, 3}, "Friends": {2}}
+
+
+def test_prefetch_bulk_loads_seasons(tmdb_provider):
+    """Seasons are loaded in one request, and episode lookups become local."""
+    prefetch({"The Wire": {1, 2, 3}}, tmdb_provider)
+    assert FakeTV.requests == [(1, "season/1,season/2,season/3")]
+    matches = tmdb_provider.get_episode_matches("The Wire", 2, 1)
+    assert matches == [{"tvshow": "The Wire", "season": 2, "episode": 1, "title": "Episode 2x1"}]
+    assert len(FakeTV.requests) == 1
+
+
+def test_prefetch_splits_large_requests(tmdb_provider):
+    """No more than twenty seasons are appended to a single request."""
+    prefetch({"Long Show": set(range(1, 31))}, tmdb_provider)
+    assert len(FakeTV.requests) == 2
+    prefetch({"Long Show": {5}}, tmdb_provider)
+    assert len(FakeTV.requests) == 2
+
+
+def test_loaded_seasons_are_bounded(monkeypatch):
+    """
+    Loaded seasons are evicted once the cache is full.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    instance = provider.TMDBProvider(cache_size=2)
+    monkeypatch.setattr(instance, "_search_tv", lambda title: [{"id": 1, "name": title}])
+    prefetch({"Long Show": {1, 2, 3}}, instance)
+    assert len(instance.seasons) == 2
+
+
+class FakeSeason:
+    """A fake `tmdbsimple.TV_Seasons` class recording the requests it receives."""
+
+    requests = []
+
+    def __init__(self, show_id, season_number):
+        self.show_id = show_id
+        self.season_number = season_number
+        self.episodes = []
+
+    def info(self):
+        self.requests.append((self.show_id, self.season_number))
+        self.episodes = [{"episode_number": 1, "name": f"Episode {self.season_number}x1"}]
+
+
+@pytest.mark.parametrize(("batch_size", "season_requests"), [(2, 0), (None, 12)])
+def test_batches_smaller_than_the_cache_use_prefetched_seasons(monkeypatch, batch_size, season_requests):
+    """
+    With more shows than the cache holds, only batches smaller than the cache avoid loading seasons twice.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+        batch_size: The number of guesses resolved together.
+        season_requests: The expected number of seasons loaded one at a time.
+    """
+    monkeypatch.setattr(provider.tmdb, "TV_Seasons", FakeSeason)
+    monkeypatch.setattr(FakeSeason, "requests", [])
+    instance = provider.TMDBProvider(cache_size=4)
+    monkeypatch.setattr(instance, "_search_tv", lambda title: [{"id": title, "name": title}])
+    shows = ["Alpha", "Bravo", "Charlie", "Delta", "Echo", "Foxtrot"]
+    names = [f"{show}.S0{season}E01.mkv" for show in shows for season in (1, 2)]
+
+    guesses = list(resolve_many(parse_many(names), instance, batch_size=batch_size))
+
+    assert all(guess.get_match()["title"] == f"Episode {guess.data['season']}x1" for guess in guesses)
+    assert len(FakeTV.requests) == len(shows)
+    assert len(FakeSeason.requests) == season_requests
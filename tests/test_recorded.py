@@ -0,0 +1,135 @@
+"""Tests for the `recorded` module."""
+
+import pytest
+import requests
+
+from mvodb.provider import TMDBProvider
+from mvodb.recorded import FixtureServer, RateLimiter, RecordedSession, RecordedStore, request_key
+
+SEASON = {"season_number": 1, "episodes": [{"episode_number": 1, "name": "The Target"}]}
+
+
+@pytest.fixture()
+def store():
+    """
+    Return a store with a few recorded responses.
+
+    Returns:
+        A store.
+    """
+    return RecordedStore(
+        {
+            "/search/tv?query=The Wire": {"page": 1, "results": [{"id": 1438, "name": "The Wire"}]},
+            "/tv/1438/season/1": SEASON,
+        }
+    )
+
+
+def test_request_key():
+    """Version prefix, authentication and query case are ignored."""
+    assert request_key("/3/search/tv", {"query": "The Wire", "api_key": "secret"}) == "/search/tv?query=the wire"
+    assert request_key("/tv/1438/season/1/") == "/tv/1438/season/1"
+
+
+def test_replay(store):
+    """
+    Recorded responses are replayed, and unknown searches return no results.
+
+    Arguments:
+        store: A store.
+    """
+    assert store.get("/3/search/tv", {"query": "the wire"})[1]["results"][0]["id"] == 1438
+    assert store.get("/3/search/tv", {"query": "Unknown"})[1]["results"] == []
+    assert store.get("/3/tv/1438/season/2")[0] == 404
+
+
+def test_derived_responses(store):
+    """
+    Appended seasons and single episodes are taken from recorded seasons.
+
+    Arguments:
+        store: A store.
+    """
+    status, show = store.get("/3/tv/1438", {"append_to_response": "season/1,season/2"})
+    assert status == 200
+    assert show == {"id": 1438, "season/1": SEASON}
+    assert store.get("/3/tv/1438/season/1/episode/1") == (200, SEASON["episodes"][0])
+
+
+def test_session(store):
+    """
+    The session answers `tmdbsimple` requests and counts them.
+
+    Arguments:
+        store: A store.
+    """
+    session = RecordedSession(store)
+    response = session.request("GET", "https://api.themoviedb.org/3/tv/1438/season/1", params={"api_key": "key"})
+    assert response.json() == SEASON
+    with pytest.raises(requests.HTTPError):
+        session.request("GET", "https://api.themoviedb.org/3/tv/1438/season/3").raise_for_status()
+    assert session.requests == 2
+
+
+def test_fixture_server(store, monkeypatch):
+    """
+    The fixture server replays responses to a provider pointed at it.
+
+    Arguments:
+        store: A store.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    monkeypatch.setattr("tmdbsimple.API_KEY", "unused")
+    server = FixtureServer(store).start()
+    try:
+        provider = TMDBProvider(base_url=server.url)
+        matches = provider.get_episode_matches("The Wire", 1, 1)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert matches == [{"tvshow": "The Wire", "season": 1, "episode": 1, "title": "The Target"}]
+    assert server.requests == 2
+
+
+def test_fixture_server_failures(store):
+    """
+    Errors and rate limiting are simulated.
+
+    Arguments:
+        store: A store.
+    """
+    server = FixtureServer(store, error_rate=1, rate_limit=RateLimiter(rate=1, burst=2), seed=1).start()
+    try:
+        statuses = [requests.get(f"{server.url}/tv/1438/season/1").status_code for _ in range(3)]
+        rate_limited = requests.get(f"{server.url}/tv/1438/season/1")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert statuses == [503, 503, 429]
+    assert rate_limited.headers["Retry-After"] == "1"
+    assert (server.requests, server.errors, server.rate_limited) == (4, 2, 2)
+
+
+def test_provider_retries(store, monkeypatch):
+    """
+    The provider retries server errors and rate limited requests, and gives up on other errors.
+
+    Arguments:
+        store: A store.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    monkeypatch.setattr("tmdbsimple.API_KEY", "unused")
+    server = FixtureServer(store, error_rate=0.3, rate_limit=RateLimiter(rate=20, burst=3), seed=2).start()
+    try:
+        provider = TMDBProvider(base_url=server.url, retries=10, backoff=0.01, max_delay=0.1)
+        movies = [provider.get_movie_matches(f"Movie {number}") for number in range(10)]
+        episodes = provider.get_episode_matches("The Wire", 1, 1)
+        with pytest.raises(requests.HTTPError, match="404"):
+            provider.get_season_episodes(1438, 9)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert movies == [[]] * 10
+    assert episodes == [{"tvshow": "The Wire", "season": 1, "episode": 1, "title": "The Target"}]
+    assert server.errors > 0
+    assert server.rate_limited > 0
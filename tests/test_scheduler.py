@@ -0,0 +1,85 @@
+"""Tests for the `scheduler` module."""
+
+import time
+from pathlib import Path
+
+from mvodb import scheduler
+from mvodb.estimate import PlannedMove
+from mvodb.scheduler import BandwidthLimiter, MoveScheduler
+
+
+def _planned(tmp_path, name, cross_device=False):
+    source = tmp_path / "src" / name
+    source.parent.mkdir(exist_ok=True)
+    source.write_bytes(name.encode() * 100)
+    (tmp_path / "dst").mkdir(exist_ok=True)
+    move = PlannedMove(source, tmp_path / "dst" / name)
+    if cross_device:
+        move.destination_device += 1
+    return move
+
+
+def test_moves_are_applied(tmp_path):
+    """
+    Renames and copies are applied, failures are returned.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    rename = _planned(tmp_path, "a.mkv")
+    copy = _planned(tmp_path, "b.mkv", cross_device=True)
+    missing = _planned(tmp_path, "c.mkv")
+    (tmp_path / "src" / "c.mkv").unlink()
+    failures = MoveScheduler().run([rename, copy, missing])
+    assert [move for move, _ in failures] == [missing]
+    assert sorted(path.name for path in (tmp_path / "dst").iterdir()) == ["a.mkv", "b.mkv"]
+    assert (tmp_path / "dst" / "b.mkv").read_bytes() == b"b.mkv" * 100
+    assert sorted(path.name for path in (tmp_path / "src").iterdir()) == []
+
+
+def test_copies_follow_inode_order(tmp_path, monkeypatch):
+    """
+    With one job per pair of devices, copies are done in source inode order.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    moves = [_planned(tmp_path, name, cross_device=True) for name in ("a.mkv", "b.mkv", "c.mkv")]
+    for inode, move in zip((3, 1, 2), moves):
+        move.inode = inode
+    copied = []
+    monkeypatch.setattr(scheduler, "copy_file", lambda source, destination, limiter: copied.append(source))
+    assert MoveScheduler(default_limit=1).run(moves) == []
+    assert copied == [moves[1].source, moves[2].source, moves[0].source]
+
+
+def test_bandwidth_limiter_waits():
+    """The limiter delays transfers exceeding its rate."""
+    limiter = BandwidthLimiter(rate=1000, burst=100)
+    start = time.monotonic()
+    limiter.consume(100)
+    limiter.consume(100)
+    assert time.monotonic() - start >= 0.09
+
+
+def test_colliding_destinations_are_rejected(tmp_path):
+    """
+    Moves to an existing destination or to the destination of another move are not applied.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    first = _planned(tmp_path, "a.720p.mkv", cross_device=True)
+    second = _planned(tmp_path, "a.1080p.mkv")
+    second.destination = first.destination
+    existing = _planned(tmp_path, "b.mkv")
+    Path(existing.destination).write_bytes(b"original")
+    failures = MoveScheduler().run([first, second, existing])
+    assert [(move, type(error)) for move, error in failures] == [
+        (second, FileExistsError),
+        (existing, FileExistsError),
+    ]
+    assert Path(first.destination).read_bytes() == b"a.720p.mkv" * 100
+    assert Path(existing.destination).read_bytes() == b"original"
+    assert Path(second.source).exists()
@@ -0,0 +1,70 @@
+"""Tests for the `templates` module."""
+
+import pytest
+
+from mvodb.templates import PathTemplates, Template
+
+EPISODE = {
+    "type": "episode",
+    "tvshow": "Agents: S.H.I.E.L.D.",
+    "season": 1,
+    "episode": 2,
+    "title": "0-8-4?",
+    "ext": "mkv",
+}
+MOVIE = {"type": "movie", "title": "AC/DC", "year": "2000", "ext": "mkv"}
+
+
+def test_default_templates():
+    """Default templates keep the historical layout, with sanitized values."""
+    templates = PathTemplates("/library")
+    assert templates.render(EPISODE) == (
+        "/library/series/Agents - S.H.I.E.L.D./Season 01/Agents - S.H.I.E.L.D. - S01E02 - 0-8-4.mkv"
+    )
+    assert templates.render(MOVIE) == "/library/movies/AC-DC (2000)/AC-DC (2000).mkv"
+
+
+def test_subtitle_template():
+    """The subtitle template replaces the extension when the language is known."""
+    templates = PathTemplates(movie="{title}.{ext}", subtitle="{ext}.{lang}")
+    assert templates.relative(dict(MOVIE, ext="srt", lang="fre")) == "AC-DC.srt.fre"
+    assert templates.relative(dict(MOVIE, ext="srt", lang=None)) == "AC-DC.srt"
+
+
+def test_literal_braces_and_format_specs():
+    """Escaped braces stay literal, and format specifications are applied."""
+    assert Template("{{x}} {season:03} {season!r}")({"season": 1}) == "{x} 001 1"
+
+
+@pytest.mark.parametrize("template", ["{}", "{0}", "{title.upper}", "{title[0]}", "{title"])
+def test_invalid_templates(template):
+    """
+    Only plain named fields are accepted.
+
+    Arguments:
+        template: An invalid template.
+    """
+    with pytest.raises(ValueError):  # noqa: PT011
+        Template(template)
+
+
+@pytest.mark.parametrize(
+    ("kind", "template"),
+    [("movie", "{title}/{yeer}.{ext}"), ("episode", "{show}/{title}.{ext}"), ("subtitle", "{year}.{ext}")],
+)
+def test_unknown_fields(kind, template):
+    """
+    Unknown fields are rejected when the templates are created, not when rendering.
+
+    Arguments:
+        kind: The kind of template.
+        template: A template using an unknown field.
+    """
+    with pytest.raises(ValueError, match="Unknown field"):
+        PathTemplates(**{kind: template})
+
+
+def test_sanitize_dots():
+    """Values cannot point to parent directories or hidden files."""
+    assert PathTemplates().relative(dict(MOVIE, title="..")) == "movies/_ (2000)/_ (2000).mkv"
+    assert PathTemplates().relative(dict(MOVIE, title=".hidden")) == "movies/hidden (2000)/hidden (2000).mkv"
@@ -0,0 +1,13 @@
+"""Tests for the `throttle` module."""
+
+from mvodb.throttle import TokenBucket
+
+
+def test_take_borrows_or_rejects():
+    """Missing tokens are taken in advance, or not taken at all."""
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.take(2) == 0
+    assert bucket.take(1, borrow=False) > 0
+    assert bucket.tokens < 1
+    assert 0.09 < bucket.take(1) < 0.2
+    assert bucket.tokens < 0